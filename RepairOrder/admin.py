@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import JobCard , JobConcern , ObjectType , ObjectStatus , Vehicle , TaskTechnician
+from .models import JobCard , JobConcern , ObjectType , ObjectStatus , Vehicle , TaskTechnician , JobCardSequence
 # Register your models here.
 
 admin.site.register(JobCard)
@@ -7,4 +7,5 @@ admin.site.register(JobConcern)
 admin.site.register(ObjectType)
 admin.site.register(ObjectStatus)
 admin.site.register(Vehicle)
-admin.site.register(TaskTechnician)
\ No newline at end of file
+admin.site.register(TaskTechnician)
+admin.site.register(JobCardSequence)
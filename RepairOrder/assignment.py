@@ -0,0 +1,84 @@
+"""
+Technician-assignment screen data.
+
+The screen needs a job card, its live concerns with the technicians already
+assigned to each, and the active technicians of the job card's station. The
+whole payload is built with three queries and cached per job card. Cache keys
+carry a per-station version (non-repeating, see accounts.caching) that is
+bumped when the station's staff changes, and a job card's entry is dropped
+whenever its concerns or assignments change.
+"""
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from accounts.caching import bump_version, cached_version
+from accounts.mixins import optimize_queryset
+from accounts.models import Employee
+from accounts.roles import Role, role_members
+
+from .models import JobCard, JobConcern, TaskTechnician
+from .serializers import JobCardListSerializer, JobConcernAssignSerializer, TechnicianSerializer
+
+ASSIGN_DATA_KEY = 'repairorder:assign-data:{jobcard_id}'
+STATION_STAFF_VERSION_KEY = 'repairorder:station-staff:version:{station_id}'
+ASSIGN_DATA_TIMEOUT = 300
+
+
+def station_staff_version(station_id) -> int:
+    return cached_version(STATION_STAFF_VERSION_KEY.format(station_id=station_id))
+
+
+def bump_station_staff_version(station_ids) -> None:
+    for station_id in set(station_ids):
+        bump_version(STATION_STAFF_VERSION_KEY.format(station_id=station_id))
+
+
+def invalidate_assign_data(jobcard_ids) -> None:
+    cache.delete_many([ASSIGN_DATA_KEY.format(jobcard_id=jobcard_id) for jobcard_id in set(jobcard_ids)])
+
+
+def station_technicians(station_id):
+    return Employee.objects.filter(  # type: ignore
+        ServiceStation_id=station_id,
+        User_id__in=role_members(Role.TECHNICIAN),
+        IsActive=True,
+    ).select_related('ServiceStation').only('EmployeeID', 'Name', 'ServiceStation__id', 'ServiceStation__name')
+
+
+def _build_assign_data(job_card):
+    concerns = JobConcern.objects.filter(JobCardID=job_card, IsDeleted=False).prefetch_related(  # type: ignore
+        Prefetch(
+            'assignedTechnicians',
+            queryset=TaskTechnician.objects.filter(IsDeleted=False).select_related('EmployeeID'),  # type: ignore
+        )
+    )
+    technicians = station_technicians(job_card.ServiceStationID_id) if job_card.ServiceStationID_id else []
+    return {
+        'job_card': JobCardListSerializer(job_card).data,
+        'job_concerns': JobConcernAssignSerializer(concerns, many=True).data,
+        'technicians': TechnicianSerializer(technicians, many=True).data,
+    }
+
+
+def get_assign_data(jobcard_id):
+    """
+    Assignment screen payload for a job card, or None if it does not exist.
+    """
+    key = ASSIGN_DATA_KEY.format(jobcard_id=jobcard_id)
+    cached = cache.get(key)
+    if cached is not None:
+        station_id, version, data = cached
+        if station_id is None or version == station_staff_version(station_id):
+            return data
+
+    job_card = optimize_queryset(JobCard.objects.filter(IsDeleted=False), JobCardListSerializer).filter(  # type: ignore
+        pk=jobcard_id
+    ).first()
+    if job_card is None:
+        return None
+
+    station_id = job_card.ServiceStationID_id
+    version = station_staff_version(station_id) if station_id else None
+    data = _build_assign_data(job_card)
+    cache.set(key, (station_id, version, data), ASSIGN_DATA_TIMEOUT)
+    return data
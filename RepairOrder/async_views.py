@@ -0,0 +1,21 @@
+from accounts.async_views import AsyncAPIView
+from accounts.mixins import optimize_queryset
+
+from .pagination import JobCardKeysetPagination
+from .serializers import JobCardListSerializer
+from .views import filter_job_cards
+
+
+class AsyncAllJobCardsView(AsyncAPIView):
+    """
+    Async variant of AllJobCardsView (same filters and keyset pagination).
+    """
+
+    async def get(self, request):
+        queryset = optimize_queryset(filter_job_cards(request.query_params), JobCardListSerializer)
+        paginator = JobCardKeysetPagination()
+        page = await paginator.apaginate_queryset(queryset, request)
+        return {
+            'next': paginator.get_next_link(),
+            'results': JobCardListSerializer(page, many=True).data,
+        }
@@ -0,0 +1,115 @@
+"""
+Opening job cards.
+
+Opening job cards from appointments is a single transaction: the appointments
+are locked with one SELECT ... FOR UPDATE, the job cards are inserted with
+their vehicle already set, all concerns go in with one bulk INSERT and the
+appointments move to ``in_progress`` with one conditional UPDATE. A single
+card and a check-in batch take the same path.
+
+Cards sent without a ``JobCardNumber`` are numbered from their station's
+sequence before the transaction starts (see RepairOrder.sequences).
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Appointment
+
+from .models import JobCard, JobConcern
+from .sequences import jobcard_numbers
+from .technicians import auto_assign_concerns
+
+# Appointments a job card can still be opened from
+OPENABLE_STATUSES = ('pending', 'confirmed')
+
+
+def _lock_appointments(appointment_ids):
+    appointments = Appointment.objects.select_for_update().filter(  # type: ignore
+        pk__in=appointment_ids,
+        IsDeleted=False,
+    ).only('id', 'status', 'VehicleID').in_bulk()
+
+    errors = {}
+    for appointment_id in appointment_ids:
+        appointment = appointments.get(appointment_id)
+        if appointment is None:
+            errors[appointment_id] = "Appointment not found."
+        elif appointment.status not in OPENABLE_STATUSES:
+            errors[appointment_id] = f"Appointment is {appointment.status}; a job card cannot be opened for it."
+    if errors:
+        raise ValidationError({'appointment_id': errors})
+    return appointments
+
+
+def _assign_numbers(items):
+    unnumbered = {}
+    for index, item in enumerate(items):
+        if not item.get('JobCardNumber'):
+            station = item.get('ServiceStationID')
+            if station is None:
+                raise ValidationError({'ServiceStationID': "Required when JobCardNumber is not given."})
+            unnumbered.setdefault(station.pk, []).append(index)
+
+    items = [dict(item) for item in items]
+    for station_id, indexes in unnumbered.items():
+        for index, number in zip(indexes, jobcard_numbers.allocate(station_id, len(indexes))):
+            items[index]['JobCardNumber'] = number
+    return items
+
+
+def open_job_cards(items, user=None):
+    """
+    Create a job card (and its concerns) for each validated
+    ``CreateJobCardSerializer`` payload in ``items``; returns the job cards in
+    the same order. Raises ValidationError, and creates nothing, if any
+    appointment is missing, already opened or listed twice.
+
+    Concerns of cards sent with ``auto_assign`` are assigned to the station's
+    least-loaded technicians, recorded as created by ``user``.
+    """
+    appointment_ids = [item['appointment_id'] for item in items if item.get('appointment_id')]
+    if len(appointment_ids) != len(set(appointment_ids)):
+        raise ValidationError({'appointment_id': "Each appointment can only be opened once per request."})
+
+    items = _assign_numbers(items)
+
+    with transaction.atomic():
+        appointments = _lock_appointments(appointment_ids) if appointment_ids else {}
+
+        jobcards, concerns_data, auto_assign = [], [], []
+        for item in items:
+            data = item.copy()
+            concerns_data.append(data.pop('concerns', []))
+            auto_assign.append(data.pop('auto_assign', False))
+            appointment = appointments.get(data.pop('appointment_id', None))
+            jobcards.append(JobCard(**data, VehicleID_id=appointment.VehicleID_id if appointment else None))
+        JobCard.objects.bulk_create(jobcards)  # type: ignore
+
+        concerns = JobConcern.objects.bulk_create([  # type: ignore
+            JobConcern(
+                JobCardID=jobcard,
+                JobConcernDescription=concern['JobConcernDescription'],
+                JobConcernTypeName=concern.get('JobConcernTypeName', ''),
+                CreatedBy=jobcard.CreatedBy,
+                CreatedOn=jobcard.CreatedOn,
+            )
+            for jobcard, concerns in zip(jobcards, concerns_data)
+            for concern in concerns
+        ])
+
+        if any(auto_assign):
+            assign_cards = {jobcard.pk for jobcard, auto in zip(jobcards, auto_assign) if auto}
+            auto_assign_concerns([concern for concern in concerns if concern.JobCardID_id in assign_cards], user)
+
+        if appointment_ids:
+            Appointment.objects.filter(  # type: ignore
+                pk__in=appointment_ids,
+                status__in=OPENABLE_STATUSES,
+            ).update(status='in_progress', updated_at=timezone.now())
+
+    return jobcards
+
+
+def open_job_card(validated_data, user=None):
+    return open_job_cards([validated_data], user)[0]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-17 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RepairOrder', '0010_remove_jobtask_createdby_remove_jobtask_jobcard_and_more'),
+        ('accounts', '0014_backfill_appointmentslotbooking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCardSequence',
+            fields=[
+                ('JobCardSequenceID', models.AutoField(primary_key=True, serialize=False)),
+                ('NextValue', models.BigIntegerField(default=1)),
+                ('ServiceStationID', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='jobcard_sequence', to='accounts.servicestation')),
+            ],
+            options={
+                'db_table': 'JobCardSequence',
+            },
+        ),
+    ]
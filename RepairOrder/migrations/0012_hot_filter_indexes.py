@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 16:03
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('RepairOrder', '0011_jobcardsequence'),
+        ('accounts', '0014_backfill_appointmentslotbooking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='jobcard',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['-CreatedOn', '-JobCardID'], name='jobcard_live_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobcard',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['ServiceStationID', '-CreatedOn', '-JobCardID'], name='jobcard_live_station_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobconcern',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['JobCardID'], name='jobconcern_live_jobcard_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-17 16:05
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('RepairOrder', '0012_hot_filter_indexes'),
+        ('accounts', '0016_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobcard',
+            name='DeletedOn',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobcardtechnician',
+            name='DeletedOn',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobconcern',
+            name='DeletedOn',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tasktechnician',
+            name='DeletedOn',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='jobcardtechnician',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['JobCardID'], name='jobcardtech_live_jobcard_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tasktechnician',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['JobConcernID'], name='tasktech_live_concern_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tasktechnician',
+            index=models.Index(condition=models.Q(('IsCompleted', False), ('IsDeleted', False)), fields=['EmployeeID'], name='tasktech_open_employee_idx'),
+        ),
+    ]
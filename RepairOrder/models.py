@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.conf import settings
+from accounts.softdelete import SoftDeleteModel
 # Create your models here.
 
 class Vehicle(models.Model):
@@ -14,7 +16,7 @@ class Vehicle(models.Model):
     def __str__(self):
         return self.PlateNumber
 
-class JobCard(models.Model):
+class JobCard(SoftDeleteModel):
     JobCardID = models.BigAutoField(primary_key=True , auto_created=True)
     JobCardTypeName = models.CharField(max_length=100)
     ServiceStationID = models.ForeignKey('accounts.ServiceStation' , on_delete=models.CASCADE , null=True , blank=True)
@@ -27,16 +29,20 @@ class JobCard(models.Model):
     CreatedOn = models.DateTimeField()
     ModifiedOn = models.DateTimeField(null=True, blank=True)
     ModifiedBy = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,null=True, blank=True,related_name='jobcards_modified')
-    IsDeleted = models.BooleanField(default=False)
     JobCardNumber = models.CharField(max_length=50)
 
     class Meta:
         db_table = "JobCard"
+        indexes = [
+            # Job card list: newest first, overall and per station
+            models.Index(fields=['-CreatedOn', '-JobCardID'], condition=Q(IsDeleted=False), name='jobcard_live_created_idx'),
+            models.Index(fields=['ServiceStationID', '-CreatedOn', '-JobCardID'], condition=Q(IsDeleted=False), name='jobcard_live_station_idx'),
+        ]
 
     def __str__(self):
         return self.JobCardNumber
 
-class JobConcern(models.Model):
+class JobConcern(SoftDeleteModel):
     JobConcernID = models.AutoField(primary_key=True)
     JobConcernDescription = models.CharField( max_length=2000, null=True,blank=True )
     JobCardID = models.ForeignKey(JobCard, on_delete=models.CASCADE, related_name="concerns")
@@ -44,7 +50,6 @@ class JobConcern(models.Model):
     IsApproved = models.BooleanField(null=True, blank=True)
     #OldJobConcernID = models.IntegerField(null=True, blank=True)
     NoIssueFound = models.BooleanField(null=True, blank=True)
-    IsDeleted = models.BooleanField(default=False)
     CreatedBy = models.ForeignKey(settings.AUTH_USER_MODEL,on_delete=models.CASCADE, null=True, blank=True,related_name='jobconcerns_created')
     CreatedOn = models.DateTimeField()
     ModifiedBy = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,null=True, blank=True,related_name='jobconcerns_modified')
@@ -52,6 +57,9 @@ class JobConcern(models.Model):
     IsPendingTaskConcern = models.BooleanField(null=True, blank=True)
     class Meta:
         db_table = "JobConcern"
+        indexes = [
+            models.Index(fields=['JobCardID'], condition=Q(IsDeleted=False), name='jobconcern_live_jobcard_idx'),
+        ]
     def __str__(self):
         return f"JobConcern {self.JobConcernID}"
 
@@ -72,18 +80,22 @@ class ObjectStatus (models.Model):
     def __str__(self):
         return f'{self.ObjectStatusID , self.ObjectStatusNameEnglish} --> {self.StatusNameEnglish}'
         
-class JobCardTechnician (models.Model):
+class JobCardTechnician (SoftDeleteModel):
     JobCardTechnicianID = models.AutoField(primary_key=True)
     JobCardID = models.ForeignKey(JobCard , on_delete=models.CASCADE , related_name='assignTechnicians')
     JobCardStatusID = models.IntegerField()
     CreatedBy = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE , related_name='jobcardtechnician_created')
     CreatedOn = models.DateTimeField(auto_now=True)
-    IsDeleted = models.BooleanField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['JobCardID'], condition=Q(IsDeleted=False), name='jobcardtech_live_jobcard_idx'),
+        ]
 
     def __str__(self):
         return f'JobCardTechnician {self.JobCardTechnicianID}'
 
-class TaskTechnician(models.Model):
+class TaskTechnician(SoftDeleteModel):
     TaskTechnicianID = models.AutoField(primary_key=True)
     JobConcernID = models.ForeignKey(JobConcern , on_delete=models.CASCADE , related_name='assignedTechnicians')
     EmployeeID = models.ForeignKey('accounts.Employee' , on_delete=models.CASCADE)
@@ -94,7 +106,26 @@ class TaskTechnician(models.Model):
     IsCompleted = models.BooleanField(default=False)
     CreatedBy = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE , related_name='tasktechnician_created')
     CreatedOn = models.DateTimeField(auto_now=True)
-    IsDeleted = models.BooleanField(default=0)
     JobCardID = models.ForeignKey('RepairOrder.JobCard', on_delete = models.CASCADE , null=True , blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['JobConcernID'], condition=Q(IsDeleted=False), name='tasktech_live_concern_idx'),
+            # Open tasks per technician (workload)
+            models.Index(fields=['EmployeeID'], condition=Q(IsDeleted=False, IsCompleted=False), name='tasktech_open_employee_idx'),
+        ]
+
+    def __str__(self):
+        return f'TaskTechnician {self.TaskTechnicianID} - Employee {self.EmployeeID}'
+
+class JobCardSequence(models.Model):
+    # Next unallocated job card number per station; see RepairOrder.sequences
+    JobCardSequenceID = models.AutoField(primary_key=True)
+    ServiceStationID = models.OneToOneField('accounts.ServiceStation', on_delete=models.CASCADE, related_name='jobcard_sequence')
+    NextValue = models.BigIntegerField(default=1)
+
+    class Meta:
+        db_table = "JobCardSequence"
+
     def __str__(self):
-        return f'TaskTechnician {self.TaskTechnicianID} - Employee {self.EmployeeID}'
\ No newline at end of file
+        return f'JobCardSequence {self.ServiceStationID_id} -> {self.NextValue}'
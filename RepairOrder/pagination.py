@@ -0,0 +1,5 @@
+from accounts.pagination import KeysetPagination
+
+
+class JobCardKeysetPagination(KeysetPagination):
+    ordering = ('-CreatedOn', '-JobCardID')
@@ -0,0 +1,67 @@
+"""
+Job card numbering.
+
+Each station has a JobCardSequence row holding its next unallocated number.
+Workers reserve numbers in blocks (JOBCARD_NUMBER_BLOCK_SIZE) by bumping that
+row under a row lock, then hand them out from memory, so most job cards are
+numbered without touching the database. Numbers are unique across processes
+but not gapless: a block left unused when a worker exits is skipped.
+
+Blocks are only cached when reserved outside a transaction. Inside one, the
+reservation could be rolled back with the caller's work, so exactly the
+numbers needed are reserved and nothing is kept for later.
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import JobCard, JobCardSequence
+
+BLOCK_SIZE = getattr(settings, 'JOBCARD_NUMBER_BLOCK_SIZE', 20)
+NUMBER_FORMAT = 'JC-{station:04d}-{value:06d}'
+
+
+def format_number(station_id, value) -> str:
+    return NUMBER_FORMAT.format(station=station_id, value=value)
+
+
+class JobCardNumberAllocator:
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks = {}  # station_id -> (next value, end of block)
+        self._lock = threading.Lock()
+
+    def allocate(self, station_id, count=1) -> list:
+        """
+        ``count`` new job card numbers for ``station_id``.
+        """
+        if transaction.get_connection().in_atomic_block:
+            start, end = self._reserve(station_id, count)
+            return [format_number(station_id, value) for value in range(start, end)]
+
+        values = []
+        with self._lock:
+            while len(values) < count:
+                next_value, end = self._blocks.get(station_id, (0, 0))
+                if next_value >= end:
+                    next_value, end = self._reserve(station_id, max(self.block_size, count - len(values)))
+                take = min(end - next_value, count - len(values))
+                values.extend(range(next_value, next_value + take))
+                self._blocks[station_id] = (next_value + take, end)
+        return [format_number(station_id, value) for value in values]
+
+    def _reserve(self, station_id, size):
+        with transaction.atomic():
+            sequence, _ = JobCardSequence.objects.select_for_update().get_or_create(  # type: ignore
+                ServiceStationID_id=station_id,
+                # Start past the cards the station already has
+                defaults={'NextValue': lambda: JobCard.all_objects.filter(ServiceStationID_id=station_id).count() + 1},  # type: ignore
+            )
+            start = sequence.NextValue
+            sequence.NextValue = start + size
+            sequence.save(update_fields=['NextValue'])
+        return start, start + size
+
+
+jobcard_numbers = JobCardNumberAllocator()
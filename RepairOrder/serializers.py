@@ -1,13 +1,25 @@
-from httpcore import Response
 from rest_framework import serializers
 from .models import JobCard, JobConcern , Vehicle , TaskTechnician
 from accounts.models import Appointment , Employee , UserRole , Roles , User , ServiceStation
+from accounts.profiling import TimedSerializerMixin
 from django.utils import timezone
+from .jobcards import open_job_card, open_job_cards
+from .technicians import assign_technicians
 
 class JobConcernSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobConcern
         fields = '__all__'
+class AssignedTechnicianSerializer(serializers.ModelSerializer):
+    Name = serializers.CharField(source='EmployeeID.Name', read_only=True)
+    class Meta:
+        model = TaskTechnician
+        fields = ['TaskTechnicianID', 'EmployeeID', 'Name', 'IsAccepted', 'IsCompleted']
+
+class JobConcernAssignSerializer(JobConcernSerializer):
+    # Technicians already assigned to the concern (prefetched)
+    assignedTechnicians = AssignedTechnicianSerializer(many=True, read_only=True)
+
 class ServiceStationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ServiceStation
@@ -22,9 +34,18 @@ class JobConcernInputSerializer(serializers.Serializer):
     JobConcernDescription = serializers.CharField(max_length=2000)
     JobConcernTypeName = serializers.CharField(max_length=100, required=False, allow_blank=True)
 
+def request_user(context):
+    request = context.get('request')
+    return request.user if request is not None else None
+
+class CreateJobCardListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        return open_job_cards(validated_data, request_user(self.context))
+
 class CreateJobCardSerializer(serializers.ModelSerializer):
     concerns = JobConcernInputSerializer(many=True, write_only=True)
     appointment_id = serializers.IntegerField(write_only=True, required=False)  # To link the job card to an appointment
+    auto_assign = serializers.BooleanField(write_only=True, default=False)  # Assign concerns to the least-loaded technicians
 
     class Meta:
         model = JobCard
@@ -38,39 +59,22 @@ class CreateJobCardSerializer(serializers.ModelSerializer):
             'JobCardNumber',
             'StatusID',
             'appointment_id',
+            'auto_assign',
             'concerns'  
         ]
+        list_serializer_class = CreateJobCardListSerializer
+        # Generated from the station's sequence when omitted
+        extra_kwargs = {'JobCardNumber': {'required': False}}
 
     def create(self, validated_data):
-        concerns_data = validated_data.pop('concerns', [])
-        appointment_id = validated_data.pop('appointment_id', None)
-        vehicle = Appointment.objects.get(id=appointment_id).VehicleID 
-        jobcard = JobCard.objects.create(**validated_data)
-        jobcard.VehicleID = vehicle
-        jobcard.save()
-        for concern in concerns_data:
-            JobConcern.objects.create(
-                JobCardID=jobcard,
-                JobConcernDescription=concern['JobConcernDescription'],
-                JobConcernTypeName=concern.get('JobConcernTypeName', ''),
-                CreatedBy=jobcard.CreatedBy,
-                CreatedOn=jobcard.CreatedOn,
-            )
-        # Update appointment status if appointment_id is provided
-        if appointment_id:
-            try:
-                ap = Appointment.objects.get(id=appointment_id)
-                ap.status = 'in_progress'
-                ap.save()
-            except Appointment.DoesNotExist:
-                pass  # Optionally, raise a validation error here
-        return jobcard
+        return open_job_card(validated_data, request_user(self.context))
+
 class VehicleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehicle
         fields = ['VehicleID', 'PlateNumber', 'VIN']
 
-class JobCardListSerializer(serializers.ModelSerializer):
+class JobCardListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     VehicleID = VehicleSerializer(read_only=True)  # This will include vehicle details in the job card list response
     class Meta:
         model = JobCard
@@ -85,6 +89,19 @@ class JobCardListSerializer(serializers.ModelSerializer):
             'StatusID',
             'VehicleID'  
         ]  
+        select_related = ('VehicleID',)
+        only = (
+            'JobCardID',
+            'JobCardTypeName',
+            'ServiceStationID',
+            'JobCardStatusName',
+            'CreatedBy',
+            'CreatedOn',
+            'JobCardNumber',
+            'StatusID',
+            'VehicleID__PlateNumber',
+            'VehicleID__VIN',
+        )
 
 class CreateTaskTechnicianSerializer(serializers.ModelSerializer):
     JobConcernID = serializers.PrimaryKeyRelatedField(queryset=JobConcern.objects.all())
@@ -102,3 +119,15 @@ class CreateTaskTechnicianSerializer(serializers.ModelSerializer):
             CreatedBy=self.context['request'].user
         )
         return tasktechnician
+
+class TaskAssignmentInputSerializer(serializers.Serializer):
+    # Plain IDs: existence is checked for the whole batch at once in assign_technicians()
+    JobConcernID = serializers.IntegerField(min_value=1)
+    EmployeeID = serializers.IntegerField(min_value=1)
+
+class BulkAssignTechnicianSerializer(serializers.Serializer):
+    assignments = TaskAssignmentInputSerializer(many=True, allow_empty=False, max_length=200)
+
+    def create(self, validated_data):
+        pairs = [(item['JobConcernID'], item['EmployeeID']) for item in validated_data['assignments']]
+        return assign_technicians(pairs, self.context['request'].user)
@@ -0,0 +1,92 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Employee, UserRole
+
+from .assignment import bump_station_staff_version, invalidate_assign_data
+from .models import JobCard, JobConcern, TaskTechnician
+from .technicians import WORKLOAD_FIELDS, open_task_employee, workload
+
+# As in accounts.signals, invalidation runs on commit so readers cannot cache
+# uncommitted data under the new state.
+
+
+@receiver(post_save, sender=JobCard)
+@receiver(post_delete, sender=JobCard)
+def invalidate_jobcard_assign_data(sender, instance, **kwargs):
+    jobcard_id = instance.pk
+    transaction.on_commit(lambda: invalidate_assign_data([jobcard_id]))
+
+
+@receiver(post_save, sender=JobConcern)
+@receiver(post_delete, sender=JobConcern)
+def invalidate_concern_assign_data(sender, instance, **kwargs):
+    jobcard_id = instance.JobCardID_id
+    transaction.on_commit(lambda: invalidate_assign_data([jobcard_id]))
+
+
+@receiver(post_save, sender=TaskTechnician)
+@receiver(post_delete, sender=TaskTechnician)
+def invalidate_task_assign_data(sender, instance, **kwargs):
+    jobcard_id = instance.JobCardID_id
+    if jobcard_id is None:
+        jobcard_id = JobConcern.objects.filter(pk=instance.JobConcernID_id).values_list('JobCardID_id', flat=True).first()  # type: ignore
+    if jobcard_id is not None:
+        transaction.on_commit(lambda: invalidate_assign_data([jobcard_id]))
+
+
+@receiver(pre_save, sender=Employee)
+def remember_employee_station(sender, instance, update_fields=None, **kwargs):
+    # An employee moved to another station also leaves the old station's staff
+    instance._previous_station_id = None
+    if instance.pk is not None and (update_fields is None or 'ServiceStation' in update_fields):
+        instance._previous_station_id = Employee.objects.filter(pk=instance.pk).values_list('ServiceStation_id', flat=True).first()  # type: ignore
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_station_staff(sender, instance, **kwargs):
+    station_ids = {instance.ServiceStation_id, getattr(instance, '_previous_station_id', None)} - {None}
+    transaction.on_commit(lambda: bump_station_staff_version(station_ids))
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_technician_stations(sender, instance, **kwargs):
+    # Gaining or losing the technician role changes who can be assigned
+    station_ids = list(Employee.objects.filter(User_id=instance.User_id).values_list('ServiceStation_id', flat=True))  # type: ignore
+    if station_ids:
+        transaction.on_commit(lambda: bump_station_staff_version(station_ids))
+
+
+@receiver(post_init, sender=TaskTechnician)
+def remember_task_workload(sender, instance, **kwargs):
+    # Partially loaded tasks (.only()/.defer()) are not tracked
+    if not WORKLOAD_FIELDS & instance.get_deferred_fields():
+        instance._workload_employee = open_task_employee(instance)
+
+
+@receiver(post_save, sender=TaskTechnician)
+def track_task_workload(sender, instance, created, **kwargs):
+    # Moves one unit of load when a task is created, accepted/declined, completed or reassigned
+    if not created and not hasattr(instance, '_workload_employee'):
+        return
+    before = None if created else instance._workload_employee
+    after = instance._workload_employee = open_task_employee(instance)
+    deltas = Counter()
+    if before is not None:
+        deltas[before] -= 1
+    if after is not None:
+        deltas[after] += 1
+    if any(deltas.values()):
+        transaction.on_commit(lambda: workload.adjust(deltas))
+
+
+@receiver(post_delete, sender=TaskTechnician)
+def release_task_workload(sender, instance, **kwargs):
+    employee_id = getattr(instance, '_workload_employee', None)
+    if employee_id is not None:
+        transaction.on_commit(lambda: workload.adjust({employee_id: -1}))
@@ -0,0 +1,195 @@
+"""
+Assigning technicians to job concerns.
+
+A batch of (concern, employee) pairs is validated and inserted in one
+transaction with a fixed number of queries: one IN query per model, one
+query for the pairs that already exist and one bulk INSERT. The concern rows
+are locked while this happens, so two requests cannot assign the same pair.
+
+Technician workload (open tasks per employee) is tracked incrementally in the
+shared cache and drives auto-assignment to the least-loaded technician.
+"""
+import heapq
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Employee
+
+from .models import JobConcern, TaskTechnician
+
+
+def assign_technicians(pairs, user):
+    """
+    Create a TaskTechnician for each ``(JobConcernID, EmployeeID)`` pair and
+    return them. Raises ValidationError, and creates nothing, if an ID does
+    not exist, an employee works at another station than the job card, or a
+    pair is repeated or already assigned.
+    """
+    from .assignment import invalidate_assign_data
+
+    if len(pairs) != len(set(pairs)):
+        raise ValidationError({'assignments': "The same technician is listed twice for a concern."})
+    concern_ids = {concern_id for concern_id, _ in pairs}
+    employee_ids = {employee_id for _, employee_id in pairs}
+
+    with transaction.atomic():
+        concerns = JobConcern.objects.select_for_update(of=('self',)).filter(  # type: ignore
+            pk__in=concern_ids,
+            IsDeleted=False,
+            JobCardID__IsDeleted=False,
+        ).select_related('JobCardID').only('JobConcernID', 'JobCardID__JobCardID', 'JobCardID__ServiceStationID').in_bulk()
+        employees = Employee.objects.filter(pk__in=employee_ids, IsActive=True).only('EmployeeID', 'ServiceStation').in_bulk()  # type: ignore
+
+        errors = {}
+        missing_concerns = sorted(concern_ids - concerns.keys())
+        if missing_concerns:
+            errors['JobConcernID'] = [f"Invalid pk \"{pk}\" - object does not exist." for pk in missing_concerns]
+        missing_employees = sorted(employee_ids - employees.keys())
+        if missing_employees:
+            errors['EmployeeID'] = [f"Invalid pk \"{pk}\" - object does not exist." for pk in missing_employees]
+        if errors:
+            raise ValidationError(errors)
+
+        wrong_station = [
+            (concern_id, employee_id) for concern_id, employee_id in pairs
+            if employees[employee_id].ServiceStation_id != concerns[concern_id].JobCardID.ServiceStationID_id
+        ]
+        if wrong_station:
+            raise ValidationError({'assignments': [
+                f"Employee {employee_id} does not work at the station of concern {concern_id}'s job card."
+                for concern_id, employee_id in wrong_station
+            ]})
+
+        existing = set(TaskTechnician.objects.filter(  # type: ignore
+            JobConcernID__in=concern_ids,
+            EmployeeID__in=employee_ids,
+            IsDeleted=False,
+        ).values_list('JobConcernID_id', 'EmployeeID_id'))
+        duplicates = [pair for pair in pairs if pair in existing]
+        if duplicates:
+            raise ValidationError({'assignments': [
+                f"Employee {employee_id} is already assigned to concern {concern_id}."
+                for concern_id, employee_id in duplicates
+            ]})
+
+        tasks = TaskTechnician.objects.bulk_create([  # type: ignore
+            TaskTechnician(
+                JobConcernID=concerns[concern_id],
+                EmployeeID=employees[employee_id],
+                JobCardID_id=concerns[concern_id].JobCardID_id,
+                CreatedBy=user,
+            )
+            for concern_id, employee_id in pairs
+        ])
+
+        # bulk_create sends no post_save, so update caches here
+        jobcard_ids = {concern.JobCardID_id for concern in concerns.values()}
+        deltas = Counter(employee_id for _, employee_id in pairs)
+        transaction.on_commit(lambda: invalidate_assign_data(jobcard_ids))
+        transaction.on_commit(lambda: workload.adjust(deltas))
+    return tasks
+
+
+# Workload
+
+WORKLOAD_KEY = 'repairorder:workload:{employee_id}'
+WORKLOAD_STATION_KEY = 'repairorder:workload:station:{station_id}'
+WORKLOAD_TIMEOUT = 60 * 60
+
+
+def open_tasks():
+    # Pending or accepted, not finished; a declined task (IsAccepted=False) is no load
+    return TaskTechnician.objects.filter(IsDeleted=False, IsCompleted=False).exclude(IsAccepted=False)  # type: ignore
+
+
+# TaskTechnician attributes open_task_employee() reads
+WORKLOAD_FIELDS = frozenset({'EmployeeID_id', 'IsDeleted', 'IsCompleted', 'IsAccepted'})
+
+
+def open_task_employee(task):
+    """
+    The employee ``task`` counts against, or None if it is not open.
+    """
+    if task.IsDeleted or task.IsCompleted or task.IsAccepted is False:
+        return None
+    return task.EmployeeID_id
+
+
+class WorkloadTracker:
+    """
+    Open task count per employee, kept in the shared cache.
+
+    A station's counts are loaded with one aggregate query the first time
+    they are needed (or after they expire) and from then on adjusted in place
+    as tasks are created, accepted, declined, completed or deleted.
+    """
+
+    def station_workloads(self, station_id, employee_ids) -> dict:
+        keys = {WORKLOAD_KEY.format(employee_id=employee_id): employee_id for employee_id in employee_ids}
+        station_key = WORKLOAD_STATION_KEY.format(station_id=station_id)
+        cached = cache.get_many([station_key, *keys])
+        if station_key in cached and len(cached) == len(keys) + 1:
+            return {employee_id: max(cached[key], 0) for key, employee_id in keys.items()}
+        return self._load(station_id, employee_ids)
+
+    def _load(self, station_id, employee_ids) -> dict:
+        counts = dict.fromkeys(employee_ids, 0)
+        counts.update(
+            open_tasks().filter(EmployeeID__ServiceStation_id=station_id)
+            .values('EmployeeID').annotate(open_count=Count('pk')).values_list('EmployeeID', 'open_count')
+        )
+        entries = {WORKLOAD_KEY.format(employee_id=employee_id): count for employee_id, count in counts.items()}
+        entries[WORKLOAD_STATION_KEY.format(station_id=station_id)] = True
+        cache.set_many(entries, WORKLOAD_TIMEOUT)
+        return {employee_id: counts[employee_id] for employee_id in employee_ids}
+
+    def adjust(self, deltas) -> None:
+        """
+        Apply ``{employee_id: change}``. Counts that are not cached are
+        skipped; they are loaded from the database when next needed.
+        """
+        for employee_id, delta in deltas.items():
+            key = WORKLOAD_KEY.format(employee_id=employee_id)
+            try:
+                if delta > 0:
+                    cache.incr(key, delta)
+                elif delta < 0:
+                    cache.decr(key, -delta)
+            except ValueError:
+                pass
+
+
+workload = WorkloadTracker()
+
+
+def auto_assign_concerns(concerns, user):
+    """
+    Assign each concern to the least-loaded active technician of its job
+    card's station, in one batch. ``concerns`` must have ``JobCardID``
+    loaded. Concerns of stations without technicians stay unassigned.
+    """
+    from .assignment import station_technicians
+
+    by_station = {}
+    for concern in concerns:
+        station_id = concern.JobCardID.ServiceStationID_id
+        if station_id is not None:
+            by_station.setdefault(station_id, []).append(concern.pk)
+
+    pairs = []
+    for station_id, concern_ids in by_station.items():
+        employee_ids = list(station_technicians(station_id).values_list('EmployeeID', flat=True))
+        if not employee_ids:
+            continue
+        heap = [(load, employee_id) for employee_id, load in workload.station_workloads(station_id, employee_ids).items()]
+        heapq.heapify(heap)
+        for concern_id in concern_ids:
+            load, employee_id = heapq.heappop(heap)
+            pairs.append((concern_id, employee_id))
+            heapq.heappush(heap, (load + 1, employee_id))
+
+    return assign_technicians(pairs, user) if pairs else []
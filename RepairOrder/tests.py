@@ -1,3 +1,86 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import Employee, ServiceStation, User, UserRole
+from accounts.roles import TECHNICIAN_ROLE_ID
+from .assignment import bump_station_staff_version, get_assign_data, station_staff_version
+from .models import JobCard, Vehicle
+
+
+class JobCardListQueryCountTests(TestCase):
+    """
+    A job card list page is one query, with the vehicle joined in, at any
+    page size (see accounts.mixins.optimize_queryset).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='advisor', password='secret')
+        self.station = ServiceStation.objects.create(  # type: ignore
+            name='Station', owner=self.user, address='Main road', phone='0300', email='station@example.com',
+        )
+        vehicles = Vehicle.objects.bulk_create([  # type: ignore
+            Vehicle(VIN=f'VIN{i}', PlateNumber=f'ABC-{i}', CreatedBy=self.user) for i in range(60)
+        ])
+        now = timezone.now()
+        JobCard.objects.bulk_create([  # type: ignore
+            JobCard(
+                JobCardTypeName='Service', ServiceStationID=self.station, VehicleID=vehicle,
+                CreatedBy=self.user, CreatedOn=now, JobCardNumber=f'JC-{i}',
+            )
+            for i, vehicle in enumerate(vehicles)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_job_card_list(self):
+        url = reverse('all-job-cards')
+        for page_size in (1, 10, 50):
+            for params in ({}, {'station': self.station.pk}):
+                with self.subTest(page_size=page_size, **params), self.assertNumQueries(1):
+                    response = self.client.get(url, {'page_size': page_size, **params})
+                self.assertEqual(len(response.data['results']), page_size)
+                self.assertIn('PlateNumber', response.data['results'][0]['VehicleID'])
+
+
+class AssignDataStaffTests(TestCase):
+    """
+    Cached assign-data follows technicians moving between stations.
+    """
+
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username='owner', password='secret')
+        self.old_station, self.new_station = [
+            ServiceStation.objects.create(  # type: ignore
+                name=name, owner=owner, address='Main road', phone='0300', email='station@example.com',
+            )
+            for name in ('Old', 'New')
+        ]
+        technician = User.objects.create_user(username='technician', password='secret')
+        UserRole.objects.create(User=technician, Role_id=TECHNICIAN_ROLE_ID)  # type: ignore
+        self.employee = Employee.objects.create(User=technician, ServiceStation=self.old_station, Name='Tech')  # type: ignore
+        self.job_card = JobCard.objects.create(  # type: ignore
+            JobCardTypeName='Service', ServiceStationID=self.old_station, CreatedOn=timezone.now(), JobCardNumber='JC-1',
+        )
+
+    def technician_names(self):
+        return [technician['Name'] for technician in get_assign_data(self.job_card.pk)['technicians']]
+
+    def test_moved_technician_leaves_old_station(self):
+        self.assertEqual(self.technician_names(), ['Tech'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.ServiceStation = self.new_station
+            self.employee.save()
+        self.assertEqual(self.technician_names(), [])
+
+    def test_staff_version_never_repeats(self):
+        seen = {station_staff_version(self.old_station.pk)}
+        for _ in range(2):
+            bump_station_staff_version([self.old_station.pk])
+            seen.add(station_staff_version(self.old_station.pk))
+        cache.clear()  # e.g. eviction or a restart
+        bump_station_staff_version([self.old_station.pk])
+        self.assertNotIn(station_staff_version(self.old_station.pk), seen)
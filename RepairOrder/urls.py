@@ -1,9 +1,13 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import CreateJobCardView , AllJobCardsView , JobCardAssignDataView , JobCardAssignTechnicianView
+from .async_views import AsyncAllJobCardsView
+from .views import CreateJobCardView , CreateJobCardBatchView , AllJobCardsView , JobCardAssignDataView , JobCardAssignTechnicianView , JobCardBulkAssignTechnicianView
 urlpatterns = [
     path('create-job-card/',CreateJobCardView.as_view(),name='create-job-card'),
+    path('create-job-cards/',CreateJobCardBatchView.as_view(),name='create-job-cards'),
     path('all-job-cards/',AllJobCardsView.as_view(),name='all-job-cards'),
+    path('async/all-job-cards/',AsyncAllJobCardsView.as_view(),name='all-job-cards-async'),
     path('jobcard/<int:jobcard_id>/assign-data/', JobCardAssignDataView.as_view(), name='jobcard-assign-data'),
-    path('assignTechnician/', JobCardAssignTechnicianView.as_view(), name='assign-technician')
+    path('assignTechnician/', JobCardAssignTechnicianView.as_view(), name='assign-technician'),
+    path('assignTechnicians/', JobCardBulkAssignTechnicianView.as_view(), name='assign-technicians')
 ]
@@ -1,44 +1,94 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from .serializers import CreateJobCardSerializer , JobCardListSerializer  , JobConcernSerializer, TechnicianSerializer, CreateTaskTechnicianSerializer
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+from .serializers import CreateJobCardSerializer , JobCardListSerializer  , JobConcernSerializer, TechnicianSerializer, CreateTaskTechnicianSerializer, BulkAssignTechnicianSerializer
 from .models import JobCard, Vehicle , JobConcern 
+from .pagination import JobCardKeysetPagination
+from .assignment import get_assign_data
 
 from accounts.models import Appointment , Employee , UserRole , Roles , User
+from accounts.mixins import OptimizedQuerySetMixin
+
+def filter_job_cards(params):
+    """
+    Live job cards filtered by the ``station``, ``status``, ``date_from`` and
+    ``date_to`` query parameters.
+    """
+    queryset = JobCard.objects.filter(IsDeleted=False)
+
+    for param, field in (('station', 'ServiceStationID'), ('status', 'StatusID')):
+        value = params.get(param)
+        if value:
+            if not value.isdigit():
+                raise ValidationError({param: "Must be an integer."})
+            queryset = queryset.filter(**{field: int(value)})
+
+    # Compare against datetime bounds rather than CreatedOn__date so the column index can be used
+    for param, lookup, offset in (('date_from', 'CreatedOn__gte', 0), ('date_to', 'CreatedOn__lt', 1)):
+        value = params.get(param)
+        if value:
+            day = parse_date(value)
+            if not day:
+                raise ValidationError({param: "Invalid date format (YYYY-MM-DD)."})
+            bound = timezone.make_aware(datetime.combine(day + timedelta(days=offset), time.min))
+            queryset = queryset.filter(**{lookup: bound})
+
+    return queryset
 
 class CreateJobCardView(APIView):
     def post(self, request, *args, **kwargs):
-        serializer = CreateJobCardSerializer(data=request.data)
+        serializer = CreateJobCardSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             jobcard = serializer.save()
             return Response({"message": "Job Card created successfully", "jobcard_id": jobcard.JobCardID}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class AllJobCardsView(APIView):
-    def get(self, request, *args, **kwargs):
-        jobcards = JobCard.objects.all()
-        serializer = JobCardListSerializer(jobcards, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+class CreateJobCardBatchView(APIView):
+    """
+    Open job cards for many appointments at once (morning check-in). Takes a
+    list of ``create-job-card`` payloads; either every card is created or none.
+    """
+    max_batch_size = 100
+
+    def post(self, request, *args, **kwargs):
+        serializer = CreateJobCardSerializer(data=request.data, many=True, context={'request': request}, allow_empty=False, max_length=self.max_batch_size)
+        if serializer.is_valid():
+            jobcards = serializer.save()
+            return Response(
+                {
+                    "message": f"{len(jobcards)} Job Cards created successfully",
+                    "jobcard_ids": [jobcard.JobCardID for jobcard in jobcards],
+                },
+                status=status.HTTP_201_CREATED
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class AllJobCardsView(OptimizedQuerySetMixin, generics.ListAPIView):
+    """
+    Paginated job card listing, newest first.
+
+    Optional filters: ``station`` (ServiceStationID), ``status`` (StatusID),
+    ``date_from`` / ``date_to`` (YYYY-MM-DD, inclusive, on CreatedOn).
+    """
+    serializer_class = JobCardListSerializer
+    pagination_class = JobCardKeysetPagination
+
+    def get_queryset(self):
+        return filter_job_cards(self.request.query_params)
 
 class JobCardAssignDataView(APIView):
     #permission_classes = [IsAuthenticated] 
 
     def get(self, request, jobcard_id):
-        try:
-            job_card = JobCard.objects.get(pk=jobcard_id)
-        except JobCard.DoesNotExist:
+        # Concerns with their current assignments, plus the job card station's technicians
+        data = get_assign_data(jobcard_id)
+        if data is None:
             return Response({'error': 'JobCard not found'}, status=404)
-
-        job_concerns = JobConcern.objects.filter(JobCardID=job_card)
-        # Assuming JobCard has a ServiceStation or BranchName field to filter technicians
-        technicians = Employee.objects.filter(User__userrole__Role__RoleID=1,
-                                              IsActive = True).distinct()
-
-        return Response({
-            'job_card': JobCardListSerializer(job_card).data,
-            'job_concerns': JobConcernSerializer(job_concerns, many=True).data,
-            'technicians': TechnicianSerializer(technicians, many=True).data,
-        })
+        return Response(data)
 class JobCardAssignTechnicianView(APIView):
     def post(self, request, *args, **kwargs):
         serializer = CreateTaskTechnicianSerializer(data=request.data, context={'request': request})
@@ -51,4 +101,23 @@ class JobCardAssignTechnicianView(APIView):
                 },
                 status=status.HTTP_201_CREATED
             )
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class JobCardBulkAssignTechnicianView(APIView):
+    """
+    Assign technicians to many concerns at once:
+    ``{"assignments": [{"JobConcernID": 1, "EmployeeID": 2}, ...]}``.
+    """
+    def post(self, request, *args, **kwargs):
+        serializer = BulkAssignTechnicianSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            tasks = serializer.save()
+            return Response(
+                {
+                    "message": f"{len(tasks)} Tasks assigned successfully",
+                    "TaskTechnicianIDs": [task.TaskTechnicianID for task in tasks],
+                    "JobCardIDs": sorted({task.JobCardID_id for task in tasks}),
+                },
+                status=status.HTTP_201_CREATED
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -28,3 +28,7 @@ class AppointmentAdmin(admin.ModelAdmin):
     date_hierarchy = 'appointment_date'
 
 admin.site.register(AppointmentSlots)
+
+admin.site.register(AppointmentSlotBooking)
+
+admin.site.register(ArchivedRecord)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField' #type:ignore
     name = 'accounts'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .profiling import CONFIG, install_query_timing
+
+        if CONFIG['ENABLED']:
+            connection_created.connect(install_query_timing, dispatch_uid='accounts.profiling')
@@ -0,0 +1,110 @@
+"""
+Async variants of read-heavy endpoints.
+
+DRF views are synchronous, so these are plain Django async views: under ASGI
+a worker keeps serving other requests while one waits on the database. Rows
+are fetched with Django's async ORM; authentication and cache lookups that
+may hit the database run through ``sync_to_async``. Responses match the
+synchronous endpoints they mirror.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.dateparse import parse_date
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .booking import day_slots
+from .catalog import get_catalog
+from .geo import parse_nearby_query, station_index
+from .mixins import optimize_queryset
+from .profiling import TimedJSONRenderer
+from .models import ServiceStation
+from .serializers import AppointmentSlotsSerializer, ServiceStationSerializer
+
+
+class AsyncAPIView(View):
+    """
+    Authenticated, read-only JSON view with ``async def get``. Handlers
+    receive the DRF request (``query_params``, ``user``) and return data or
+    an HttpResponse; APIExceptions become JSON error responses.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in ('get', 'head'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        drf_request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = await sync_to_async(lambda: drf_request.user)()
+            if not user or not user.is_authenticated:
+                raise NotAuthenticated()
+            request.user = user
+            data = await getattr(self, request.method.lower())(drf_request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            return self.render(detail, exc.status_code)
+        if isinstance(data, HttpResponse):
+            return data
+        return self.render(data)
+
+    def render(self, data, status=200):
+        return HttpResponse(TimedJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncNearbyServiceStationsView(AsyncAPIView):
+    """
+    Async variant of NearbyServiceStationsView.
+    """
+
+    async def get(self, request):
+        try:
+            lat, lng, radius = parse_nearby_query(request.query_params)
+        except ValueError as error:
+            return self.render({"error": str(error)}, 400)
+
+        nearby = await sync_to_async(station_index.nearby)(lat, lng, radius)
+        queryset = optimize_queryset(
+            ServiceStation.objects.filter(is_active=True, pk__in=[pk for pk, dist in nearby]),  # type: ignore
+            ServiceStationSerializer,
+        )
+        stations = {station.pk: station async for station in queryset}
+        catalog = await sync_to_async(get_catalog)()
+        result_stations = [stations[pk] for pk, dist in nearby if pk in stations]
+        return ServiceStationSerializer(result_stations, many=True, context={'catalog': catalog}).data
+
+
+class AsyncAppointmentSlotsByDayView(AsyncAPIView):
+    """
+    Async variant of AppointmentSlotsByDayView.
+    """
+
+    async def get(self, request):
+        date_str = request.query_params.get("appointment_date")
+        if not date_str:
+            raise ValidationError({"date": "Date query parameter is required (YYYY-MM-DD)."})
+        appointment_date = parse_date(date_str)
+        if not appointment_date:
+            raise ValidationError({"date": "Invalid date format."})
+
+        slots = [slot async for slot in day_slots(appointment_date)]
+        return AppointmentSlotsSerializer(slots, many=True).data
+
+
+class AsyncStationServiceView(AsyncAPIView):
+    """
+    Async variant of StationServiceView.
+    """
+
+    async def get(self, request, station_id):
+        station = await ServiceStation.objects.filter(id=station_id).only('id').afirst()  # type: ignore
+        if station is None:
+            return self.render({'detail': 'No ServiceStation matches the given query.'}, 404)
+        service_ids = [pk async for pk in station.services_offered.order_by('id').values_list('id', flat=True)]
+        catalog = await sync_to_async(get_catalog)()
+        return [catalog[pk] for pk in service_ids if pk in catalog]
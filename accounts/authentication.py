@@ -0,0 +1,71 @@
+"""
+OAuth2 bearer token authentication with a TTL cache in front of the token table.
+
+A validated AccessToken (with its user and application already loaded) is
+cached under the token's SHA-256 checksum, so repeat requests with the same
+token authenticate without touching the database. Entries expire after
+token_cache_timeout() or at token expiry, whichever is sooner, and are dropped
+immediately when the token is saved, revoked or deleted or its user changes.
+
+Dropping an entry only reaches every worker when the cache is shared (Redis,
+Memcached). With a per-process cache such as LocMemCache the other workers
+keep their copy, so there entries live for TOKEN_LOCAL_CACHE_TIMEOUT seconds
+only: a revoked token or deactivated user is still accepted by other workers
+for at most that long.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+from oauth2_provider.contrib.rest_framework import OAuth2Authentication
+
+from .caching import cache_is_shared
+
+TOKEN_CACHE_KEY = 'accounts:oauth2-token:{}'
+TOKEN_CACHE_TIMEOUT = 300
+TOKEN_LOCAL_CACHE_TIMEOUT = 5
+
+
+def token_cache_timeout() -> int:
+    return TOKEN_CACHE_TIMEOUT if cache_is_shared() else TOKEN_LOCAL_CACHE_TIMEOUT
+
+
+def token_cache_key(token_checksum: str) -> str:
+    return TOKEN_CACHE_KEY.format(token_checksum)
+
+
+def invalidate_tokens(token_checksums) -> None:
+    cache.delete_many([token_cache_key(checksum) for checksum in token_checksums])
+
+
+def _bearer_token(request):
+    auth = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, token = auth.partition(' ')
+    if scheme.lower() == 'bearer' and token.strip():
+        return token.strip()
+    return None
+
+
+class CachedOAuth2Authentication(OAuth2Authentication):
+
+    def authenticate(self, request):
+        if request is None:
+            return None
+
+        token = _bearer_token(request)
+        if token is None:
+            # Tokens passed in the query string or body take the uncached path
+            return super().authenticate(request)
+
+        key = token_cache_key(hashlib.sha256(token.encode('utf-8')).hexdigest())
+        access_token = cache.get(key)
+        if access_token is not None and access_token.is_valid():
+            return access_token.user, access_token
+
+        result = super().authenticate(request)
+        if result is not None:
+            user, access_token = result
+            timeout = min(token_cache_timeout(), int((access_token.expires - timezone.now()).total_seconds()))
+            if timeout > 0:
+                cache.set(key, access_token, timeout)
+        return result
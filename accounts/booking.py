@@ -0,0 +1,143 @@
+"""
+Slot capacity bookkeeping.
+
+Each (station, slot, date) has an AppointmentSlotBooking counter row. A
+reservation is a single conditional UPDATE (``BookedCount < MaxAppointments``)
+so concurrent requests serialise on that one row instead of racing a COUNT(*).
+Cancelling, deleting or rescheduling an appointment gives its place back, and
+the same rows answer availability queries for a date range.
+"""
+from datetime import timedelta
+
+from django.db.models import F
+
+from .models import Appointment, AppointmentSlotBooking, AppointmentSlots
+
+
+class SlotFullError(Exception):
+    pass
+
+
+def _booked_count(station, slot, appointment_date, exclude=None):
+    # Only used to seed a counter row the first time a slot/date is booked
+    appointments = Appointment.objects.filter(  # type: ignore
+        service_station=station,
+        appointment_date=appointment_date,
+        appointment_time=slot.AppointmentTime,
+        IsDeleted=False,
+    ).exclude(status='cancelled')
+    if exclude is not None:
+        appointments = appointments.exclude(pk=exclude.pk)
+    return appointments.count()
+
+
+def day_slots(appointment_date):
+    """
+    Live slots offered on ``appointment_date``'s weekday, by time. Day names
+    match case-insensitively, which slots_live_day_time_idx (on
+    ``UPPER("AppointmentDay")``) serves.
+    """
+    return AppointmentSlots.objects.filter(  # type: ignore
+        AppointmentDay__iexact=appointment_date.strftime('%A'),
+        IsDeleted=False,
+    ).order_by('AppointmentTime')
+
+
+def find_slot(appointment_date, appointment_time):
+    """
+    The live slot offered on ``appointment_date``'s weekday at
+    ``appointment_time``, or None.
+    """
+    return day_slots(appointment_date).filter(AppointmentTime=appointment_time).first()
+
+
+def booking_key(appointment):
+    """
+    The (station_id, slot_id, date) an appointment currently holds a place in,
+    or None if it holds none (cancelled, deleted or not tied to a slot).
+    """
+    if appointment.IsDeleted or appointment.status == 'cancelled' or appointment.AppointSlotID_id is None:
+        return None
+    return (appointment.service_station_id, appointment.AppointSlotID_id, appointment.appointment_date)
+
+
+def reserve_slot(station, slot, appointment_date, exclude=None):
+    """
+    Take one place in ``slot`` at ``station`` on ``appointment_date``.
+
+    Must run inside the transaction that creates the appointment, so the
+    reservation is rolled back with it. Raises SlotFullError when the slot has
+    no capacity left. ``exclude`` is an already-saved appointment being moved
+    into this slot, which must not count towards a freshly seeded counter.
+    """
+    booking, _ = AppointmentSlotBooking.objects.get_or_create(  # type: ignore
+        ServiceStation=station,
+        AppointmentSlot=slot,
+        AppointmentDate=appointment_date,
+        defaults={'BookedCount': lambda: _booked_count(station, slot, appointment_date, exclude)},
+    )
+    updated = AppointmentSlotBooking.objects.filter(  # type: ignore
+        pk=booking.pk,
+        BookedCount__lt=slot.MaxAppointments,
+    ).update(BookedCount=F('BookedCount') + 1)
+    if not updated:
+        raise SlotFullError()
+
+
+def release_slot(station_id, slot_id, appointment_date):
+    AppointmentSlotBooking.objects.filter(  # type: ignore
+        ServiceStation_id=station_id,
+        AppointmentSlot_id=slot_id,
+        AppointmentDate=appointment_date,
+        BookedCount__gt=0,
+    ).update(BookedCount=F('BookedCount') - 1)
+
+
+def sync_booking(before, appointment):
+    """
+    Move an appointment's reservation after it was saved. ``before`` is the
+    ``booking_key()`` taken before the change. Must run in the same
+    transaction as the save.
+    """
+    after = booking_key(appointment)
+    if after == before:
+        return
+    if after is not None:
+        reserve_slot(appointment.service_station, appointment.AppointSlotID, appointment.appointment_date, exclude=appointment)
+    if before is not None:
+        release_slot(*before)
+
+
+def availability(station_id, date_from, date_to):
+    """
+    Remaining capacity of every slot at a station for each date in
+    ``[date_from, date_to]``, read from the booking counters in two queries.
+    """
+    slots_by_day = {}
+    for slot in AppointmentSlots.objects.filter(IsDeleted=False).order_by('AppointmentTime'):  # type: ignore
+        slots_by_day.setdefault(slot.AppointmentDay.lower(), []).append(slot)
+
+    booked = {
+        (slot_id, day): count
+        for slot_id, day, count in AppointmentSlotBooking.objects.filter(  # type: ignore
+            ServiceStation_id=station_id,
+            AppointmentDate__range=(date_from, date_to),
+        ).values_list('AppointmentSlot_id', 'AppointmentDate', 'BookedCount')
+    }
+
+    days = []
+    day = date_from
+    while day <= date_to:
+        slots = []
+        for slot in slots_by_day.get(day.strftime('%A').lower(), []):
+            count = booked.get((slot.AppointmentSlotsID, day), 0)
+            slots.append({
+                'AppointmentSlotsID': slot.AppointmentSlotsID,
+                'AppointmentTime': slot.AppointmentTime,
+                'MaxAppointments': slot.MaxAppointments,
+                'Booked': count,
+                'Remaining': max(slot.MaxAppointments - count, 0),
+            })
+        days.append({'date': day, 'slots': slots})
+        day += timedelta(days=1)
+    return days
@@ -0,0 +1,49 @@
+"""
+What the configured Django cache can be trusted with.
+
+Several lookups (service type catalog, token cache, rendered bodies) are only
+correct across gunicorn workers when every worker sees the same cache.
+Per-process backends such as LocMemCache are fine for development and tests,
+so callers fall back to short lifetimes or skip caching instead of failing.
+
+Cache versions (catalog, station index, station staff) are ``time.time_ns()``
+values rather than counters: a counter restarted after its key was lost to a
+restart, eviction or expiry would hand out old versions again and bring
+stale entries keyed by them back.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """
+    True when entries written by one worker process are seen by all the
+    others (Redis, Memcached, database or file-based caches).
+    """
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def new_version() -> int:
+    return time.time_ns()
+
+
+def cached_version(key, timeout=None) -> int:
+    """
+    The version stored under ``key``, starting a new one when it is unknown.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), timeout)
+        version = cache.get(key) or new_version()
+    return version
+
+
+def bump_version(key, timeout=None) -> None:
+    cache.set(key, new_version(), timeout)
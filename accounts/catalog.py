@@ -0,0 +1,94 @@
+"""
+Cached ServiceType catalog.
+
+The catalog is small and rarely changes, so it is served from a process-local
+copy backed by the shared Django cache. Every ServiceType save/delete stores a
+new version in the cache; readers compare versions (one cache round trip)
+and only rebuild from the database when the catalog actually changed. The
+version doubles as the catalog's ETag; the time it was set is its
+Last-Modified.
+
+Versions are ``time.time_ns()`` values rather than a counter, so a version
+lost to a restart or eviction is never reused for different content. With a
+per-process cache (LocMemCache) a change is only seen by the worker that made
+it, so there the version expires after CATALOG_LOCAL_MAX_AGE seconds and
+other workers pick up changes within that time.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+from .caching import cache_is_shared
+
+CATALOG_VERSION_KEY = 'accounts:service-type-catalog:version'
+CATALOG_DATA_KEY = 'accounts:service-type-catalog:data:{version}'
+CATALOG_MODIFIED_KEY = 'accounts:service-type-catalog:modified'
+CATALOG_DATA_TIMEOUT = 24 * 60 * 60
+CATALOG_LOCAL_MAX_AGE = 30
+
+_local = threading.local()
+
+
+def _version_timeout():
+    return None if cache_is_shared() else CATALOG_LOCAL_MAX_AGE
+
+
+def catalog_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Unknown (first use, eviction or expiry): start a new version, since
+        # the catalog may have changed while it was gone
+        if cache.add(CATALOG_VERSION_KEY, time.time_ns(), _version_timeout()):
+            cache.set(CATALOG_MODIFIED_KEY, time.time(), None)
+        version = cache.get(CATALOG_VERSION_KEY) or time.time_ns()
+    return version
+
+
+def bump_catalog_version() -> None:
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), _version_timeout())
+    cache.set(CATALOG_MODIFIED_KEY, time.time(), None)
+
+
+def catalog_modified() -> float:
+    """
+    Unix time of the last catalog change. When unknown (e.g. evicted) it
+    restarts at now, which only ever makes clients refetch.
+    """
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        cache.add(CATALOG_MODIFIED_KEY, time.time(), None)
+        modified = cache.get(CATALOG_MODIFIED_KEY, time.time())
+    return modified
+
+
+def catalog_etag(request=None, *args, **kwargs) -> str:
+    # Signature matches django.views.decorators.http.condition(etag_func=...)
+    return f'service-types-v{catalog_version()}'
+
+
+def _build():
+    from .models import ServiceType
+    from .serializers import ServiceTypeSerializer
+
+    service_types = ServiceType.objects.order_by('id')  # type: ignore
+    return {item['id']: item for item in ServiceTypeSerializer(service_types, many=True).data}
+
+
+def get_catalog() -> dict:
+    """
+    Return ``{service_type_id: serialized ServiceType}`` for the current
+    catalog version. Treat the result as read-only; it is shared.
+    """
+    version = catalog_version()
+    if getattr(_local, 'version', None) == version:
+        return _local.data
+
+    key = CATALOG_DATA_KEY.format(version=version)
+    data = cache.get(key)
+    if data is None:
+        data = _build()
+        cache.set(key, data, CATALOG_DATA_TIMEOUT)
+
+    _local.version, _local.data = version, data
+    return data
@@ -0,0 +1,200 @@
+"""
+Spatial lookups for service stations.
+
+Active stations are bucketed into a fixed lat/lng grid held in memory. A radius
+query only scores the stations in the grid cells overlapping the search
+circle's bounding box instead of every station in the table, and scores them
+with one vectorised Haversine pass.
+"""
+import math
+import threading
+import time
+
+import numpy as np
+
+from .caching import bump_version, cached_version
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180  # ~111.2 km per degree of latitude
+CELL_SIZE_DEG = 0.1  # ~11 km cells
+LNG_CELLS = int(round(360 / CELL_SIZE_DEG))
+
+# Half the Earth's circumference: a larger radius covers nothing more
+MAX_RADIUS_KM = math.pi * EARTH_RADIUS_KM
+DEFAULT_RADIUS_KM = 10
+
+INDEX_VERSION_KEY = 'accounts:station-index:version'
+# Upper bound on how stale a worker's index can get when the cache backend is
+# not shared between processes (e.g. the default LocMemCache).
+INDEX_MAX_AGE = 300
+
+
+def parse_nearby_query(params) -> tuple:
+    """
+    ``(lat, lng, radius_km)`` from the ``lat``, ``lng`` and optional
+    ``radius`` (km) query parameters of a nearby-stations request. Raises
+    ValueError, with the message to return in a 400, for missing, non-numeric,
+    non-finite or out-of-range values. Radii beyond MAX_RADIUS_KM are clamped.
+    """
+    lat, lng = params.get('lat'), params.get('lng')
+    if not lat or not lng:
+        raise ValueError("Latitude and longitude are required")
+    try:
+        lat, lng = float(lat), float(lng)
+        radius = float(params.get('radius', DEFAULT_RADIUS_KM))
+    except ValueError:
+        raise ValueError("Invalid coordinates") from None
+    if not (math.isfinite(lat) and math.isfinite(lng) and -90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Invalid coordinates")
+    if not math.isfinite(radius) or radius < 0:
+        raise ValueError("Invalid radius")
+    return lat, lng, min(radius, MAX_RADIUS_KM)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance (in km) between two lat/lng points.
+    """
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_batch(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """
+    Great-circle distances (in km) from one point to arrays of lat/lng points,
+    computed in a single vectorised pass.
+    """
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lng2 = np.radians(np.asarray(lngs, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def rank_by_distance(lat: float, lng: float, rows, radius_km: float = None) -> list:
+    """
+    Score ``(pk, lat, lng)`` rows against a point and return ``(pk, distance_km)``
+    pairs sorted closest first, optionally limited to ``radius_km``.
+
+    Use this for ad-hoc candidate sets, e.g. the stations offering a given
+    service: ``rank_by_distance(lat, lng, stations.values_list('id', 'latitude', 'longitude'))``.
+    """
+    rows = [row for row in rows if row[1] is not None and row[2] is not None]
+    if not rows:
+        return []
+    pks, lats, lngs = zip(*rows)
+    return _rank(lat, lng, np.asarray(pks), np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64), radius_km)
+
+
+def _rank(lat, lng, pks, lats, lngs, radius_km):
+    dists = haversine_batch(lat, lng, lats, lngs)
+    if radius_km is not None:
+        keep = dists <= radius_km
+        pks, dists = pks[keep], dists[keep]
+    order = np.argsort(dists, kind='stable')
+    return list(zip(pks[order].tolist(), dists[order].tolist()))
+
+
+def _cell(lat: float, lng: float) -> tuple:
+    return int(math.floor(lat / CELL_SIZE_DEG)), int(math.floor(lng / CELL_SIZE_DEG)) % LNG_CELLS
+
+
+class StationGridIndex:
+    """
+    Process-local grid index of active station coordinates.
+
+    The index is rebuilt lazily: saving or deleting a station stores a new
+    version in the cache (a non-repeating one, see accounts.caching), and the
+    next lookup in any worker that sees a different version reloads the
+    coordinates with a single query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells = None
+        self._version = None
+        self._built_at = 0.0
+
+    def invalidate(self) -> None:
+        self._cells = None
+        bump_version(INDEX_VERSION_KEY)
+
+    def _load(self):
+        from .models import ServiceStation
+
+        rows = ServiceStation.objects.filter(  # type: ignore
+            is_active=True,
+            latitude__isnull=False,
+            longitude__isnull=False,
+        ).values_list('id', 'latitude', 'longitude')
+
+        buckets = {}
+        for pk, lat, lng in rows:
+            bucket = buckets.setdefault(_cell(lat, lng), ([], [], []))
+            bucket[0].append(pk)
+            bucket[1].append(lat)
+            bucket[2].append(lng)
+
+        cells = {
+            key: (np.asarray(pks), np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64))
+            for key, (pks, lats, lngs) in buckets.items()
+        }
+        return cells
+
+    def _ensure_fresh(self):
+        version = cached_version(INDEX_VERSION_KEY)
+        cells = self._cells
+        if cells is not None and self._version == version and time.monotonic() - self._built_at < INDEX_MAX_AGE:
+            return cells
+
+        with self._lock:
+            if self._cells is None or self._version != version or time.monotonic() - self._built_at >= INDEX_MAX_AGE:
+                self._cells = self._load()
+                self._version = version
+                self._built_at = time.monotonic()
+            return self._cells
+
+    def _candidate_cells(self, cells, lat: float, lng: float, radius_km: float):
+        dlat = radius_km / KM_PER_DEGREE
+        lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+
+        cos_lat = min(math.cos(math.radians(lat_lo)), math.cos(math.radians(lat_hi)))
+        dlng = 180.0 if cos_lat <= 1e-9 else radius_km / (KM_PER_DEGREE * cos_lat)
+
+        row_lo, row_hi = int(math.floor(lat_lo / CELL_SIZE_DEG)), int(math.floor(lat_hi / CELL_SIZE_DEG))
+        if dlng >= 180.0:
+            col_span = LNG_CELLS
+            col_lo = 0
+        else:
+            col_lo = int(math.floor((lng - dlng) / CELL_SIZE_DEG))
+            col_span = min(int(math.floor((lng + dlng) / CELL_SIZE_DEG)) - col_lo + 1, LNG_CELLS)
+
+        # For very large radii it is cheaper to walk the occupied cells than the box.
+        if (row_hi - row_lo + 1) * col_span > len(cells):
+            cols = None if col_span >= LNG_CELLS else {(col_lo + i) % LNG_CELLS for i in range(col_span)}
+            for (row, col), bucket in cells.items():
+                if row_lo <= row <= row_hi and (cols is None or col in cols):
+                    yield bucket
+            return
+
+        for row in range(row_lo, row_hi + 1):
+            for i in range(col_span):
+                bucket = cells.get((row, (col_lo + i) % LNG_CELLS))
+                if bucket:
+                    yield bucket
+
+    def nearby(self, lat: float, lng: float, radius_km: float) -> list:
+        """
+        Return ``(station_id, distance_km)`` pairs within ``radius_km`` of the
+        given point, closest first.
+        """
+        cells = self._ensure_fresh()
+        buckets = list(self._candidate_cells(cells, lat, lng, radius_km))
+        if not buckets:
+            return []
+        pks, lats, lngs = (np.concatenate(column) for column in zip(*buckets))
+        return _rank(lat, lng, pks, lats, lngs, radius_km)
+
+
+station_index = StationGridIndex()
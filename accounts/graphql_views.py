@@ -0,0 +1,195 @@
+"""
+GraphQL endpoint for the accounts schema.
+
+Requests are authenticated like the REST API, documents are checked by the
+static cost/depth rules before execution, and parsed + validated documents are
+cached per query hash. Clients can also use automatic persisted queries
+(Apollo's ``extensions.persistedQuery`` protocol) to send just the hash.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast, parse, specified_rules, validate
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .query_cost import QueryCostRule
+
+PERSISTED_QUERY_KEY = 'accounts:graphql:persisted:{}'
+PERSISTED_QUERY_TIMEOUT = 7 * 24 * 60 * 60
+DOCUMENT_CACHE_SIZE = 500
+
+
+class DocumentCache:
+    """
+    Small process-local LRU of parsed documents that passed validation.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+            return document
+
+    def set(self, key, document):
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.size:
+                self._documents.popitem(last=False)
+
+
+documents = DocumentCache(DOCUMENT_CACHE_SIZE)
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class AuthenticatedGraphQLView(GraphQLView):
+    """
+    GraphQL endpoint authenticated with the REST API's authentication classes
+    (OAuth2 bearer tokens) instead of being open to anonymous clients.
+    """
+    validation_rules = (*specified_rules, QueryCostRule)
+
+    def dispatch(self, request, *args, **kwargs):
+        request.body  # read the body now so GraphQLView can still parse it after authentication
+        drf_request = Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = drf_request.user
+        except APIException as exc:
+            return JsonResponse({"errors": [{"message": str(exc.detail)}]}, status=exc.status_code)
+        if not user or not user.is_authenticated:
+            return JsonResponse({"errors": [{"message": "Authentication credentials were not provided."}]}, status=401)
+        request.user = user
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_persisted_query(self, request, data):
+        """
+        Return ``(query, error)`` for an automatic persisted query request, or
+        ``(None, None)`` if the request does not use one.
+        """
+        extensions = data.get('extensions') or request.GET.get('extensions')
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                return None, GraphQLError("Invalid 'extensions' parameter.")
+        persisted = (extensions or {}).get('persistedQuery') if isinstance(extensions, dict) else None
+        if not persisted:
+            return None, None
+
+        digest = persisted.get('sha256Hash')
+        if not digest:
+            return None, GraphQLError("persistedQuery requires a sha256Hash.")
+
+        query = data.get('query') or request.GET.get('query')
+        if query:
+            if query_hash(query) != digest:
+                return None, GraphQLError("provided sha does not match query")
+            cache.set(PERSISTED_QUERY_KEY.format(digest), query, PERSISTED_QUERY_TIMEOUT)
+            return query, None
+
+        query = cache.get(PERSISTED_QUERY_KEY.format(digest))
+        if query is None:
+            # Apollo clients retry with the full query when they see this message
+            return None, GraphQLError("PersistedQueryNotFound")
+        return query, None
+
+    def parse_and_validate(self, query):
+        """
+        Return ``(document, errors)``, reusing the cached document when this
+        exact query text has been validated before.
+        """
+        key = query_hash(query)
+        document = documents.get(key)
+        if document is not None:
+            return document, None
+
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            return None, [e]
+
+        errors = validate(self.schema.graphql_schema, document, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS)
+        if errors:
+            return None, errors
+        documents.set(key, document)
+        return document, None
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        persisted_query, error = self.get_persisted_query(request, data)
+        if error is not None:
+            return ExecutionResult(data=None, errors=[error])
+        query = persisted_query or query
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        document, errors = self.parse_and_validate(query)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseNotAllowed(
+                ["POST"],
+                "Can only perform a {} operation from a POST request.".format(operation_ast.operation.value),
+            ))
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(self.schema.graphql_schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            return execute(self.schema.graphql_schema, document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
@@ -0,0 +1,89 @@
+"""
+Conditional GETs and rendered-body caching for rarely changing resources.
+
+A view using ConditionalGetMixin describes the requested resource with
+``get_resource_version()``, which returns a version string and a
+last-modified time. The version is the ETag, so it must never repeat for
+different content: build it from row timestamps and the catalog version
+(a ``time_ns()`` value, see accounts.catalog), not from counters that
+restart. A request whose ``If-None-Match`` / ``If-Modified-Since`` still
+matches gets a 304 before any serializer runs.
+
+Otherwise ``get_data()`` is returned as a DRF Response, so content
+negotiation and the configured renderers apply as in any other view. With a
+shared cache (see accounts.caching), rendered JSON bodies are also kept
+there, keyed by the resource version and media type, and ``get_data()`` only
+runs on a miss. A change produces a new version and so a new key; stale
+bodies just expire. With a per-process cache, bodies are rendered on every
+request: each worker would otherwise keep its own copy for a day.
+"""
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .caching import cache_is_shared
+
+BODY_KEY = 'accounts:http-body:{resource}:{version}:{media_type}'
+BODY_TIMEOUT = 24 * 60 * 60
+
+
+def row_version(pk, updated_at) -> str:
+    # Microsecond resolution: two saves within the same second still differ
+    return f'{pk}-{int(updated_at.timestamp() * 1_000_000)}'
+
+
+class ConditionalGetMixin:
+    """
+    ``GET`` handler for views that set ``cache_resource`` (a name used in
+    ETags and cache keys) and implement ``get_resource_version`` and
+    ``get_data``. Both receive the view's request and URL kwargs.
+    """
+    cache_resource = None
+
+    def get_resource_version(self, request, *args, **kwargs):
+        """
+        Return ``(version, last_modified)``, with ``last_modified`` a Unix
+        timestamp or None. Raise Http404 for a missing or hidden resource.
+        """
+        raise NotImplementedError
+
+    def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        version, last_modified = self.get_resource_version(request, *args, **kwargs)
+        etag = quote_etag(f'{self.cache_resource}-{version}')
+        if last_modified is not None:
+            last_modified = int(last_modified)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.get_body_response(request, version, *args, **kwargs)
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def get_body_response(self, request, version, *args, **kwargs):
+        # Only JSON bodies are cached; other formats (e.g. the browsable API) are always rendered
+        if not cache_is_shared() or request.accepted_renderer.format != 'json':
+            return Response(self.get_data(request, *args, **kwargs))
+
+        key = BODY_KEY.format(resource=self.cache_resource, version=version, media_type=request.accepted_media_type)
+        cached = cache.get(key)
+        if cached is not None:
+            content_type, body = cached
+            return HttpResponse(body, content_type=content_type)
+
+        def store(rendered):
+            # Must return None: a post-render callback's return value replaces the response
+            if rendered.status_code == 200:
+                cache.set(key, (rendered['Content-Type'], rendered.content), BODY_TIMEOUT)
+
+        response = Response(self.get_data(request, *args, **kwargs))
+        response.add_post_render_callback(store)
+        return response
@@ -0,0 +1,64 @@
+"""
+Request-scoped batch loaders for the GraphQL schema.
+
+List resolvers ``prime`` a loader with every foreign key their rows point at.
+The first ``load`` that misses the loader's cache then fetches all pending
+keys with one ``IN`` query, so resolving ``user`` / ``service_station`` /
+``service_type`` on N appointments costs one query per relation instead of N.
+"""
+from .models import ServiceStation, ServiceType, User
+
+
+class BatchLoader:
+    def __init__(self, queryset, on_load=None):
+        self.queryset = queryset
+        self.on_load = on_load
+        self._cache = {}
+        self._pending = set()
+
+    def prime(self, keys) -> None:
+        self._pending.update(key for key in keys if key is not None and key not in self._cache)
+
+    def load(self, key):
+        if key is None:
+            return None
+        if key not in self._cache:
+            self._pending.add(key)
+            self._flush()
+        return self._cache.get(key)
+
+    def _flush(self) -> None:
+        keys, self._pending = self._pending, set()
+        found = self.queryset.in_bulk(keys)
+        for key in keys:
+            self._cache[key] = found.get(key)
+        if self.on_load is not None:
+            self.on_load(found.values())
+
+
+class Loaders:
+    def __init__(self):
+        self.users = BatchLoader(User.objects.all())  # type: ignore
+        # Stations fetched for appointments queue their owners for the next user batch
+        self.stations = BatchLoader(ServiceStation.objects.all(), on_load=self.prime_stations)  # type: ignore
+        self.service_types = BatchLoader(ServiceType.objects.all())  # type: ignore
+
+    def prime_appointments(self, appointments) -> None:
+        self.users.prime(appointment.user_id for appointment in appointments)
+        self.stations.prime(appointment.service_station_id for appointment in appointments)
+        self.service_types.prime(appointment.service_type_id for appointment in appointments)
+
+    def prime_stations(self, stations) -> None:
+        self.users.prime(station.owner_id for station in stations)
+
+
+def get_loaders(context) -> Loaders:
+    """
+    Loaders live on the request (GraphQL ``info.context``) so nothing is
+    shared between requests.
+    """
+    loaders = getattr(context, '_graphql_loaders', None)
+    if loaders is None:
+        loaders = Loaders()
+        context._graphql_loaders = loaders
+    return loaders
@@ -0,0 +1,82 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from accounts.geo import haversine_batch, rank_by_distance
+from accounts.models import ServiceStation
+
+
+def legacy_distance_to(station, lat, lng):
+    # Copy of the original per-instance ServiceStation.distance_to implementation
+    from math import radians, sin, cos, sqrt, atan2
+
+    if station.latitude is None or station.longitude is None:
+        return float('inf')
+
+    R = 6371
+    lat1 = radians(float(station.latitude))
+    lon1 = radians(float(station.longitude))
+    lat2 = radians(float(lat))
+    lon2 = radians(float(lng))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return R * c
+
+
+class Command(BaseCommand):
+    help = "Benchmark the per-station distance loop against the batch Haversine scorer (no database needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--radius', type=float, default=10.0)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _best_of(self, repeat, fn):
+        best = float('inf')
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        lat, lng, radius = 24.86, 67.01, options['radius']
+
+        self.stdout.write(f"{'stations':>10} {'loop (ms)':>12} {'batch (ms)':>12} {'rank (ms)':>12} {'speedup':>9}")
+        for size in options['sizes']:
+            stations = [
+                ServiceStation(id=i, latitude=lat + rng.uniform(-2, 2), longitude=lng + rng.uniform(-2, 2))
+                for i in range(size)
+            ]
+            rows = [(s.id, s.latitude, s.longitude) for s in stations]
+            lats = np.array([s.latitude for s in stations])
+            lngs = np.array([s.longitude for s in stations])
+
+            def loop():
+                nearby = []
+                for station in stations:
+                    dist = legacy_distance_to(station, lat, lng)
+                    if dist <= radius:
+                        nearby.append((dist, station))
+                nearby.sort(key=lambda x: x[0])
+                return [station.id for dist, station in nearby]
+
+            loop_time, expected = self._best_of(options['repeat'], loop)
+            batch_time, _ = self._best_of(options['repeat'], lambda: haversine_batch(lat, lng, lats, lngs))
+            rank_time, ranked = self._best_of(options['repeat'], lambda: rank_by_distance(lat, lng, rows, radius))
+
+            if [pk for pk, dist in ranked] != expected:
+                self.stderr.write(self.style.ERROR(f"Result mismatch at {size} stations"))
+
+            self.stdout.write(
+                f"{size:>10} {loop_time * 1000:>12.2f} {batch_time * 1000:>12.2f} "
+                f"{rank_time * 1000:>12.2f} {loop_time / rank_time:>8.1f}x"
+            )
@@ -0,0 +1,76 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.booking import day_slots
+from accounts.models import Appointment
+from RepairOrder.models import JobCard, JobConcern
+
+# Plan fragments (PostgreSQL, SQLite) that show an index is being used
+INDEX_MARKERS = ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan', 'USING INDEX', 'USING COVERING INDEX', 'USING INTEGER PRIMARY KEY')
+
+
+def hot_queries():
+    """
+    The hot filters the Meta.indexes are meant to serve, as (name, queryset).
+    accounts.tests.HotQueryIndexTests runs the same check in the test suite.
+    Parameters are taken from existing rows so the plans reflect real data.
+    """
+    appointment = Appointment.objects.filter(IsDeleted=False).order_by('-id').first()  # type: ignore
+    day = appointment.appointment_date if appointment else datetime.date.today()
+    at = appointment.appointment_time if appointment else datetime.time(9)
+    user_id = appointment.user_id if appointment else 0
+    station_id = appointment.service_station_id if appointment else 0
+    jobcard_id = JobCard.objects.order_by('-JobCardID').values_list('JobCardID', flat=True).first() or 0  # type: ignore
+
+    return [
+        ('appointment-list page', Appointment.objects.filter(IsDeleted=False).order_by('appointment_date', 'appointment_time', 'id')[:50]),  # type: ignore
+        ('slot booking count', Appointment.objects.filter(  # type: ignore
+            service_station_id=station_id, appointment_date=day, appointment_time=at, IsDeleted=False,
+        ).exclude(status='cancelled')),
+        ("user's appointments", Appointment.objects.filter(user_id=user_id, IsDeleted=False)),  # type: ignore
+        # The same querysets the slot views and booking use
+        ('slot lookup', day_slots(day).filter(AppointmentTime=at)),
+        ('slots by day', day_slots(day)),
+        ('job card concerns', JobConcern.objects.filter(JobCardID_id=jobcard_id, IsDeleted=False)),  # type: ignore
+        ('job card list page', JobCard.objects.filter(IsDeleted=False).order_by('-CreatedOn', '-JobCardID')[:50]),  # type: ignore
+        ('station job card list page', JobCard.objects.filter(  # type: ignore
+            ServiceStationID_id=station_id, IsDeleted=False,
+        ).order_by('-CreatedOn', '-JobCardID')[:50]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot appointment/slot/job card queries and report whether each one uses an index. "
+        "With --check, fail if any of them does not (a query-plan regression)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Exit with an error if a query does not use an index.")
+        parser.add_argument(
+            '--force-index', action='store_true',
+            help="PostgreSQL only: disable sequential scans, so small tables still show whether a usable index exists.",
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the full plan of every query.")
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if options['force_index'] and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in hot_queries():
+                plan = queryset.explain()
+                uses_index = any(marker in plan for marker in INDEX_MARKERS)
+                if not uses_index:
+                    failures.append(name)
+                status = self.style.SUCCESS('index') if uses_index else self.style.ERROR('no index')
+                self.stdout.write(f"{name:<30} {status}")
+                if options['verbose_plans'] or not uses_index:
+                    self.stdout.write('    ' + plan.replace('\n', '\n    '))
+
+        if failures and options['check']:
+            raise CommandError(f"Queries without an index: {', '.join(failures)}")
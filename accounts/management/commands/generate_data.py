@@ -0,0 +1,388 @@
+import random
+from collections import Counter
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+from oauth2_provider.models import AccessToken
+
+from accounts.catalog import bump_catalog_version
+from accounts.geo import station_index
+from accounts.models import (
+    Appointment,
+    AppointmentSlotBooking,
+    AppointmentSlots,
+    Employee,
+    Roles,
+    ServiceStation,
+    ServiceType,
+    User,
+    UserRole,
+)
+from accounts.roles import ROLE_IDS, TECHNICIAN_ROLE_ID, TECHNICIAN_ROLE_NAME
+from RepairOrder.models import JobCard, JobConcern, TaskTechnician, Vehicle
+
+# Everything generated is tagged with these so --clear can find it again
+USERNAME_PREFIX = 'bench_'
+SERVICE_TYPE_PREFIX = 'Bench '
+VIN_PREFIX = 'BENCH'
+JOB_CARD_PREFIX = 'BENCH-'
+PASSWORD = 'bench-password'
+CLEAR_BATCH_SIZE = 10000  # pks per DELETE, well under PostgreSQL's bind parameter limit
+# Owns the slots generate_data adds when the database has no other user
+SLOT_OWNER_USERNAME = 'slot_owner'
+
+# Row counts at --scale 1
+BASE_COUNTS = {
+    'customers': 200,
+    'stations': 20,
+    'technicians_per_station': 5,
+    'appointments': 2000,
+    'job_cards': 500,
+}
+SERVICE_NAMES = (
+    'Oil change', 'Brake service', 'Tyre rotation', 'Wheel alignment', 'Battery check', 'AC service',
+    'Engine tune-up', 'Car wash', 'Transmission service', 'Suspension check', 'Diagnostics', 'Detailing',
+)
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+SLOT_HOURS = range(9, 17)
+STATUSES = ('pending', 'confirmed', 'in_progress', 'completed', 'cancelled')
+CONCERNS = ('Strange noise', 'Warning light on', 'Brakes squeal', 'Vibration at speed', 'Hard to start', 'Leaking fluid')
+# Stations are spread around Karachi
+CENTER = (24.86, 67.01)
+SPREAD_DEGREES = 0.5
+
+
+def all_rows(model):
+    # Soft-deleted rows are still rows a delete would cascade to
+    return getattr(model, 'all_objects', model._default_manager)
+
+
+def generated_rows():
+    """
+    ``[(model, queryset)]`` of every generated row, dependents before the rows
+    they point at, so deleting them in order never cascades. Slots are shared
+    with real appointments and are not generated data.
+    """
+    users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    stations = ServiceStation.objects.filter(owner__in=users)
+    service_types = ServiceType.objects.filter(name__startswith=SERVICE_TYPE_PREFIX)
+    job_cards = JobCard.all_objects.filter(JobCardNumber__startswith=JOB_CARD_PREFIX, ServiceStationID__in=stations)
+    Through = ServiceStation.services_offered.through
+    return [
+        (TaskTechnician, TaskTechnician.all_objects.filter(JobCardID__in=job_cards)),
+        (JobConcern, JobConcern.all_objects.filter(JobCardID__in=job_cards)),
+        (JobCard, job_cards),
+        (AppointmentSlotBooking, AppointmentSlotBooking.objects.filter(ServiceStation__in=stations)),
+        (Appointment, Appointment.all_objects.filter(user__in=users, service_station__in=stations)),
+        (Vehicle, Vehicle.objects.filter(VIN__startswith=VIN_PREFIX, CreatedBy__in=users)),
+        (Employee, Employee.objects.filter(User__in=users, ServiceStation__in=stations)),
+        (Through, Through.objects.filter(models.Q(servicestation__in=stations) | models.Q(servicetype__in=service_types))),
+        (ServiceStation, stations),
+        (ServiceType, service_types),
+        (UserRole, UserRole.objects.filter(User__in=users)),
+        (AccessToken, AccessToken.objects.filter(user__in=users)),
+        (User, users),
+    ]
+
+
+def foreign_dependents(rows):
+    """
+    ``{label: count}`` of rows that are not generated but would be deleted
+    along with generated ones (through on_delete=CASCADE).
+    """
+    generated = dict(rows)
+    found = Counter()
+    for model, queryset in rows:
+        for relation in model._meta.related_objects:
+            if relation.many_to_many or relation.on_delete is not models.CASCADE:
+                continue
+            related = relation.related_model
+            dependents = all_rows(related).filter(**{f'{relation.field.name}__in': queryset})
+            if related in generated:
+                dependents = dependents.exclude(pk__in=generated[related].values('pk'))
+            count = dependents.count()
+            if count:
+                found[related._meta.label] += count
+    return found
+
+
+def slot_owner():
+    """
+    A user that is not generated, to own the slots generate_data adds, so
+    clearing generated users never takes shared slots with it.
+    """
+    user = User.objects.exclude(username__startswith=USERNAME_PREFIX).order_by('-is_superuser', 'pk').first()  # type: ignore
+    return user or User.objects.create_user(SLOT_OWNER_USERNAME, is_active=False)  # unusable password
+
+
+def bench_roles():
+    """
+    ``{name: Roles}`` for the roles generated users get. The technician role
+    is the row with TECHNICIAN_ROLE_ID whatever its name (see accounts.roles),
+    and is looked up first so a row created by name can never take that ID.
+    """
+    technician, created = Roles.objects.get_or_create(  # type: ignore
+        RoleID=TECHNICIAN_ROLE_ID, defaults={'RoleName': TECHNICIAN_ROLE_NAME},
+    )
+    if created:
+        # An explicit ID does not advance the sequence; move it past the row
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Roles]):
+                cursor.execute(sql)
+    roles = {'technician': technician}
+    for name in ('admin', 'stations', 'user'):
+        roles[name] = (
+            Roles.objects.filter(RoleName__iexact=name).exclude(RoleID__in=ROLE_IDS).first()  # type: ignore
+            or Roles.objects.create(RoleName=name)  # type: ignore
+        )
+    return roles
+
+
+def generated_counts():
+    return {
+        'users': User.objects.filter(username__startswith=USERNAME_PREFIX).count(),
+        'stations': ServiceStation.objects.filter(owner__username__startswith=USERNAME_PREFIX).count(),
+        'appointments': Appointment.all_objects.filter(user__username__startswith=USERNAME_PREFIX).count(),
+        'job_cards': JobCard.all_objects.filter(ServiceStationID__owner__username__startswith=USERNAME_PREFIX).count(),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate reproducible synthetic data (users, stations with coordinates, service types, slots, "
+        "appointments, vehicles, job cards, concerns and technician tasks) at a configurable scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help=f"Multiplier for the base row counts {BASE_COUNTS}.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help="Delete previously generated data first.")
+        parser.add_argument('--clear-only', action='store_true', help="Delete previously generated data and stop.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['clear'] or options['clear_only']:
+            self.clear()
+            if options['clear_only']:
+                self.stdout.write(self.style.SUCCESS('Deleted generated data'))
+                return
+        with transaction.atomic():
+            counts = self.generate(options['scale'], random.Random(options['seed']), options['batch_size'])
+        # bulk_create sends no signals, so refresh the cached station index and catalog here
+        station_index.invalidate()
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            'Generated ' + ', '.join(f'{count} {name}' for name, count in counts.items())
+        ))
+
+    def clear(self):
+        with transaction.atomic():
+            users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+            # Earlier runs created slots as a generated user; hand them over instead of deleting them
+            owned_slots = AppointmentSlots.all_objects.filter(CreatedBy__in=users)  # type: ignore
+            if owned_slots.exists():
+                owned_slots.update(CreatedBy=slot_owner())
+            AppointmentSlots.all_objects.filter(UpdatedBy__in=users).update(UpdatedBy=None)  # type: ignore
+
+            rows = generated_rows()
+            foreign = foreign_dependents(rows)
+            if foreign:
+                raise CommandError(
+                    "Generated data is referenced by rows generate_data did not create ("
+                    + ', '.join(f'{count} {label}' for label, count in sorted(foreign.items()))
+                    + "); delete or reassign them first."
+                )
+            # Delete exactly the rows checked above, by pk; nothing is left for a delete to cascade to
+            generated = [(model, list(queryset.values_list('pk', flat=True))) for model, queryset in rows]
+            for model, pks in generated:
+                for start in range(0, len(pks), CLEAR_BATCH_SIZE):
+                    batch = all_rows(model).filter(pk__in=pks[start:start + CLEAR_BATCH_SIZE])
+                    if hasattr(batch, 'hard_delete'):
+                        batch.hard_delete()
+                    else:
+                        batch.delete()
+
+    def generate(self, scale, rng, batch_size):
+        def scaled(name):
+            return max(1, int(BASE_COUNTS[name] * scale))
+
+        now = timezone.now()
+        today = timezone.localdate()
+        password = make_password(PASSWORD)  # hashed once, shared by every generated user
+        run = f'{now:%Y%m%d%H%M%S}{rng.randrange(1000):03d}'
+
+        def bulk(model, objs):
+            return model.objects.bulk_create(objs, batch_size=batch_size)  # type: ignore
+
+        # Users: customers, station owners and technicians
+        n_stations = scaled('stations')
+        n_technicians = n_stations * BASE_COUNTS['technicians_per_station']
+        customers = bulk(User, [
+            User(username=f'{USERNAME_PREFIX}{run}_customer{i}', email=f'customer{i}@example.com', password=password)
+            for i in range(scaled('customers'))
+        ])
+        owners = bulk(User, [
+            User(username=f'{USERNAME_PREFIX}{run}_owner{i}', email=f'owner{i}@example.com', password=password)
+            for i in range(n_stations)
+        ])
+        technician_users = bulk(User, [
+            User(username=f'{USERNAME_PREFIX}{run}_tech{i}', email=f'tech{i}@example.com', password=password)
+            for i in range(n_technicians)
+        ])
+
+        roles = bench_roles()
+        bulk(UserRole, (
+            [UserRole(User=user, Role=roles['user']) for user in customers]
+            + [UserRole(User=user, Role=roles['stations']) for user in owners]
+            + [UserRole(User=user, Role=roles['technician']) for user in technician_users]
+        ))
+
+        service_types = bulk(ServiceType, [
+            ServiceType(name=f'{SERVICE_TYPE_PREFIX}{name}', description=f'{name} ({run})', price=Decimal(rng.randrange(500, 15000)) / 100)
+            for name in SERVICE_NAMES
+        ])
+
+        stations = bulk(ServiceStation, [
+            ServiceStation(
+                name=f'Bench Station {i}',
+                owner=owner,
+                address=f'{i} Bench Road',
+                latitude=CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+                longitude=CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+                phone=f'0300{i:07d}'[:15],
+                email=f'station{i}@example.com',
+            )
+            for i, owner in enumerate(owners)
+        ])
+        Through = ServiceStation.services_offered.through
+        bulk(Through, [
+            Through(servicestation_id=station.pk, servicetype_id=service.pk)
+            for station in stations
+            for service in rng.sample(service_types, rng.randint(3, len(service_types)))
+        ])
+
+        employees = bulk(Employee, [
+            Employee(User=user, ServiceStation=stations[i % n_stations], Name=f'Technician {i}')
+            for i, user in enumerate(technician_users)
+        ])
+        employees_by_station = {}
+        for employee in employees:
+            employees_by_station.setdefault(employee.ServiceStation_id, []).append(employee)
+
+        # Slots are shared by all stations; reuse existing ones for the same day and time
+        def live_slots():
+            return {
+                (slot.AppointmentDay.lower(), slot.AppointmentTime): slot
+                for slot in AppointmentSlots.objects.order_by('AppointmentSlotsID')  # type: ignore
+            }
+
+        slots = live_slots()
+        missing = [(day, time(hour)) for day in DAYS for hour in SLOT_HOURS if (day.lower(), time(hour)) not in slots]
+        if missing:
+            # Created as a user --clear leaves alone: real appointments may book these slots too
+            creator = slot_owner()
+            bulk(AppointmentSlots, [
+                AppointmentSlots(AppointmentDay=day, AppointmentTime=at, MaxAppointments=rng.randint(3, 8), CreatedBy=creator)
+                for day, at in missing
+            ])
+            slots = live_slots()
+
+        n_appointments = scaled('appointments')
+        vehicles = bulk(Vehicle, [
+            Vehicle(VIN=f'{VIN_PREFIX}{run}{i:08d}', PlateNumber=f'BN-{i:06d}', CreatedBy=rng.choice(customers))
+            for i in range(max(1, n_appointments * 3 // 4))
+        ])
+
+        appointments = []
+        for i in range(n_appointments):
+            day = today + timedelta(days=rng.randint(-60, 30))
+            at = time(rng.choice(SLOT_HOURS))
+            station = rng.choice(stations)
+            status = 'completed' if day < today and rng.random() < 0.7 else rng.choice(STATUSES)
+            appointments.append(Appointment(
+                user=rng.choice(customers),
+                service_station=station,
+                service_type=rng.choice(service_types),
+                appointment_date=day,
+                appointment_time=at,
+                status=status,
+                notes='',
+                AppointSlotID=slots[(day.strftime('%A').lower(), at)],
+                VehicleID=rng.choice(vehicles),
+                IsDeleted=rng.random() < 0.05,
+            ))
+        appointments = bulk(Appointment, appointments)
+
+        # Booking counters, as reserve_slot would have left them
+        booked = Counter(
+            (appointment.service_station.pk, appointment.AppointSlotID.pk, appointment.appointment_date)
+            for appointment in appointments
+            if not appointment.IsDeleted and appointment.status != 'cancelled'
+        )
+        bulk(AppointmentSlotBooking, [
+            AppointmentSlotBooking(ServiceStation_id=station_id, AppointmentSlot_id=slot_id, AppointmentDate=day, BookedCount=count)
+            for (station_id, slot_id, day), count in booked.items()
+        ])
+
+        n_job_cards = min(scaled('job_cards'), len(appointments))
+        job_cards = bulk(JobCard, [
+            JobCard(
+                JobCardTypeName='General',
+                ServiceStationID=appointment.service_station,
+                VehicleID=appointment.VehicleID,
+                StatusID=rng.randint(1, 4),
+                JobCardStatusName='Open',
+                JobCardOpenDate=now - timedelta(days=rng.randint(0, 60)),
+                CreatedBy=appointment.service_station.owner,
+                CreatedOn=now - timedelta(days=rng.randint(0, 60), seconds=rng.randint(0, 86400)),
+                JobCardNumber=f'{JOB_CARD_PREFIX}{run}-{i:06d}',
+                IsDeleted=rng.random() < 0.05,
+            )
+            for i, appointment in enumerate(rng.sample(appointments, n_job_cards))
+        ])
+
+        concerns = bulk(JobConcern, [
+            JobConcern(
+                JobCardID=job_card,
+                JobConcernDescription=rng.choice(CONCERNS),
+                JobConcernTypeName='Customer',
+                CreatedBy=job_card.CreatedBy,
+                CreatedOn=job_card.CreatedOn,
+            )
+            for job_card in job_cards
+            for _ in range(rng.randint(1, 4))
+        ])
+
+        tasks = []
+        for concern in concerns:
+            technicians = employees_by_station.get(concern.JobCardID.ServiceStationID_id)
+            if not technicians or rng.random() < 0.2:
+                continue  # some concerns stay unassigned
+            completed = rng.random() < 0.5
+            tasks.append(TaskTechnician(
+                JobConcernID=concern,
+                EmployeeID=rng.choice(technicians),
+                JobCardID=concern.JobCardID,
+                IsAccepted=True if completed else rng.choice((None, True, False)),
+                IsCompleted=completed,
+                ActualTimeSpent=rng.randint(15, 240) if completed else None,
+                CreatedBy=concern.CreatedBy,
+            ))
+        tasks = bulk(TaskTechnician, tasks)
+
+        return {
+            'users': len(customers) + len(owners) + len(technician_users),
+            'stations': len(stations),
+            'service types': len(service_types),
+            'technicians': len(employees),
+            'vehicles': len(vehicles),
+            'appointments': len(appointments),
+            'job cards': len(job_cards),
+            'concerns': len(concerns),
+            'tasks': len(tasks),
+        }
@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.profiling import percentile
+
+DEFAULT_ENDPOINTS = {
+    'appointment-list': '/api/accounts/appointments/',
+    'service-station-list': '/api/accounts/service-stations/',
+    'nearby-service-stations': '/api/accounts/service-stations/nearby/?lat=24.86&lng=67.01&radius=10',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running server: requests/sec and p50/p95/p99 latency per endpoint. "
+        "Run it against each serving setup (e.g. runserver, then gunicorn with persistent "
+        "connections or pooling) and compare the reports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--token', help="OAuth2 access token sent as a Bearer token.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per endpoint first.")
+        parser.add_argument(
+            '--endpoint', action='append', default=[], metavar='NAME=PATH',
+            help="Endpoint to test (repeatable); defaults to the appointment and station lists and nearby stations.",
+        )
+        parser.add_argument('--label', default='', help="Name of the setup under test, stored in the report.")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this file.")
+
+    def _endpoints(self, options):
+        if not options['endpoint']:
+            return DEFAULT_ENDPOINTS
+        endpoints = {}
+        for item in options['endpoint']:
+            name, sep, path = item.partition('=')
+            if not sep:
+                raise CommandError(f"Expected NAME=PATH, got {item!r}")
+            endpoints[name] = path
+        return endpoints
+
+    def _run(self, url, headers, total, concurrency):
+        local = threading.local()
+
+        def call(_):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            start = time.perf_counter()
+            try:
+                ok = session.get(url, headers=headers, timeout=30).status_code < 400
+            except requests.RequestException:
+                ok = False
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(call, range(total)))
+        return time.perf_counter() - start, results
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        base_url = options['base_url'].rstrip('/')
+        report = {'label': options['label'], 'concurrency': options['concurrency'], 'endpoints': {}}
+
+        self.stdout.write(f"{'endpoint':<28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for name, path in self._endpoints(options).items():
+            url = base_url + path
+            if options['warmup']:
+                self._run(url, headers, options['warmup'], options['concurrency'])
+            elapsed, results = self._run(url, headers, options['requests'], options['concurrency'])
+
+            latencies = sorted(latency * 1000 for latency, ok in results)
+            errors = sum(1 for latency, ok in results if not ok)
+            row = {
+                'requests': len(results),
+                'errors': errors,
+                'rps': len(results) / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+            }
+            report['endpoints'][name] = row
+            self.stdout.write(
+                f"{name:<28} {row['rps']:>9.1f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+                f"{row['p99_ms']:>9.1f} {errors:>7}"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(report, fh, indent=2)
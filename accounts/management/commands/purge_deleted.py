@@ -0,0 +1,118 @@
+import json
+from datetime import timedelta
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from accounts.models import ArchivedRecord
+from accounts.softdelete import SoftDeleteModel
+
+
+def soft_delete_models():
+    return [model for model in apps.get_models() if issubclass(model, SoftDeleteModel)]
+
+
+def has_live_dependents(collector):
+    """
+    True when deleting what ``collector`` collected would remove a row that is
+    not soft-deleted itself (e.g. a live appointment on a deleted slot).
+    """
+    for model, instances in collector.data.items():
+        if issubclass(model, SoftDeleteModel) and any(not instance.IsDeleted for instance in instances):
+            return True
+    for queryset in collector.fast_deletes:
+        if issubclass(queryset.model, SoftDeleteModel) and queryset.filter(IsDeleted=False).exists():
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Move soft-deleted rows older than --days out of their tables in batches. "
+        "Each row, and every row its deletion cascades to, is copied to ArchivedRecord first "
+        "unless --no-archive is given. Rows whose deletion would cascade to rows that are not "
+        "soft-deleted (e.g. a deleted slot with live appointments) are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Only purge rows deleted at least this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--include-undated', action='store_true',
+            help="Also purge deleted rows without DeletedOn (deleted before it was recorded).",
+        )
+        parser.add_argument('--no-archive', action='store_true', help="Delete without archiving.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be purged.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        condition = Q(DeletedOn__lt=cutoff)
+        if options['include_undated']:
+            condition |= Q(DeletedOn__isnull=True)
+
+        for model in soft_delete_models():
+            queryset = model.all_objects.filter(condition, IsDeleted=True)
+            if options['dry_run']:
+                self.stdout.write(f"{model._meta.label:<32} {queryset.count():>8} to purge")
+                continue
+
+            purged = archived = 0
+            kept = set()
+            while True:
+                pks = list(queryset.exclude(pk__in=kept).order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+                if not pks:
+                    break
+                batch_purged, batch_archived, batch_kept = self._purge_batch(model, pks, archive=not options['no_archive'])
+                purged += batch_purged
+                archived += batch_archived
+                kept.update(batch_kept)
+            self.stdout.write(
+                f"{model._meta.label:<32} {purged:>8} purged, {archived:>8} rows archived, "
+                f"{len(kept):>8} kept (live dependents)"
+            )
+
+    def _collect(self, model, pks):
+        collector = Collector(using=DEFAULT_DB_ALIAS)
+        collector.collect(model.all_objects.filter(pk__in=pks))
+        return collector
+
+    def _purge_batch(self, model, pks, archive):
+        """
+        Archive and delete the rows in ``pks`` that only cascade to
+        soft-deleted rows. Returns ``(purged, archived, kept_pks)``.
+        """
+        with transaction.atomic():
+            collector = self._collect(model, pks)
+
+            kept = []
+            if has_live_dependents(collector):
+                # Rare: find the rows responsible one by one and leave them in place
+                kept = [pk for pk in pks if has_live_dependents(self._collect(model, [pk]))]
+                pks = [pk for pk in pks if pk not in kept]
+                if not pks:
+                    return 0, 0, kept
+                collector = self._collect(model, pks)
+
+            archived = 0
+            if archive:
+                groups = [list(instances) for instances in collector.data.values()]
+                groups += [list(queryset) for queryset in collector.fast_deletes]
+                records = []
+                for instances in groups:
+                    for row in json.loads(serializers.serialize('json', instances)):
+                        records.append(ArchivedRecord(
+                            ModelLabel=row['model'],
+                            ObjectID=str(row['pk']),
+                            Data=row['fields'],
+                            DeletedOn=row['fields'].get('DeletedOn'),
+                        ))
+                ArchivedRecord.objects.bulk_create(records, batch_size=1000)  # type: ignore
+                archived = len(records)
+
+            collector.delete()
+        return len(pks), archived, kept
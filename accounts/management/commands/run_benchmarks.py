@@ -0,0 +1,175 @@
+import json
+import platform
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from oauth2_provider.models import AccessToken
+from rest_framework.test import APIClient
+
+from accounts.management.commands.generate_data import USERNAME_PREFIX, bench_roles, generated_counts
+from accounts.models import ServiceStation, User, UserRole
+from accounts.profiling import percentile
+from RepairOrder.models import JobCard
+
+ADMIN_USERNAME = f'{USERNAME_PREFIX}admin'
+
+
+def endpoints():
+    """
+    ``{name: path}`` of the endpoints to time, pointed at generated rows.
+    """
+    station = ServiceStation.objects.filter(owner__username__startswith=USERNAME_PREFIX).order_by('id').first()  # type: ignore
+    job_card = JobCard.objects.filter(  # type: ignore
+        ServiceStationID__owner__username__startswith=USERNAME_PREFIX,
+    ).order_by('JobCardID').first()
+    if station is None or job_card is None:
+        raise CommandError("No generated data found; run generate_data first or drop --no-generate.")
+    today = timezone.localdate().isoformat()
+    return {
+        'appointment-list': reverse('appointment-list'),
+        'appointment-availability': f"{reverse('appointment-availability')}?station={station.pk}&date_from={today}",
+        'appointment-slots-by-day': f"{reverse('appointment-slots-by-day')}?appointment_date={today}",
+        'service-type-list': reverse('service-type-list'),
+        'service-station-list': reverse('service-station-list'),
+        'service-station-list-compact': f"{reverse('service-station-list')}?compact=1",
+        'service-station-detail': reverse('service-station-detail', args=[station.pk]),
+        'nearby-service-stations': f"{reverse('nearby-service-stations')}?lat=24.86&lng=67.01&radius=25",
+        'station-services': reverse('station-services', args=[station.pk]),
+        'all-job-cards': reverse('all-job-cards'),
+        'jobcard-assign-data': reverse('jobcard-assign-data', args=[job_card.pk]),
+    }
+
+
+def bench_client():
+    """
+    APIClient authenticated as an admin through a real OAuth2 bearer token,
+    so token lookup is part of every timed request.
+    """
+    user, _ = User.objects.get_or_create(username=ADMIN_USERNAME, defaults={'email': 'admin@example.com'})  # type: ignore
+    UserRole.objects.get_or_create(User=user, Role=bench_roles()['admin'])  # type: ignore
+    token, _ = AccessToken.objects.get_or_create(  # type: ignore
+        user=user, token=f'{ADMIN_USERNAME}-token',
+        defaults={'expires': timezone.now() + timedelta(days=1), 'scope': 'read write'},
+    )
+    if token.expires <= timezone.now():
+        token.expires = timezone.now() + timedelta(days=1)
+        token.save(update_fields=['expires'])
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.token}')
+    return client
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate data at each scale (1x, 10x, 100x by default) and record, per API endpoint, latency "
+        "percentiles, query count, peak Python memory and response size in a JSON report. Reports are "
+        "written with sorted keys and no timestamps so two runs can be diffed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', type=float, default=[1, 10, 100])
+        parser.add_argument('--iterations', type=int, default=20, help="Timed requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=2, help="Unmeasured requests per endpoint first.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--endpoint', action='append', default=[], metavar='NAME', help="Only time these endpoints (repeatable).")
+        parser.add_argument('--no-generate', action='store_true', help="Benchmark the existing data once instead of regenerating per scale.")
+        parser.add_argument('--keep-data', action='store_true', help="Leave the generated data in place afterwards.")
+        parser.add_argument('--label', default='', help="Name of the build under test, stored in the report.")
+        parser.add_argument('--output', default='benchmark_report.json')
+
+    def _measure(self, client, path, iterations, warmup):
+        for _ in range(warmup):
+            client.get(path)
+
+        latencies = []
+        queries = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+
+        # Separate pass: tracemalloc slows allocation down and would skew the timings
+        tracemalloc.start()
+        try:
+            client.get(path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        latencies.sort()
+        return {
+            'status': response.status_code,
+            'response_bytes': len(response.content),
+            'latency_ms': {
+                'min': round(latencies[0], 2),
+                'mean': round(sum(latencies) / len(latencies), 2),
+                'p50': round(percentile(latencies, 50), 2),
+                'p95': round(percentile(latencies, 95), 2),
+                'max': round(latencies[-1], 2),
+            },
+            'queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def _run_scale(self, options):
+        client = bench_client()
+        targets = endpoints()
+        if options['endpoint']:
+            unknown = set(options['endpoint']) - set(targets)
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            targets = {name: path for name, path in targets.items() if name in options['endpoint']}
+
+        results = {}
+        for name, path in targets.items():
+            row = results[name] = self._measure(client, path, options['iterations'], options['warmup'])
+            self.stdout.write(
+                f"  {name:<30} {row['status']:>4} {row['latency_ms']['p50']:>9.1f} {row['latency_ms']['p95']:>9.1f} "
+                f"{row['queries']:>8} {row['peak_memory_kb']:>10.1f}"
+            )
+        return {'rows': generated_counts(), 'endpoints': results}
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        report = {
+            'label': options['label'],
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'settings': {key: options[key] for key in ('iterations', 'warmup', 'seed')},
+            'scales': {},
+        }
+        scales = [None] if options['no_generate'] else options['scales']
+
+        # The test client sends Host: testserver
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            try:
+                for scale in scales:
+                    if scale is not None:
+                        self.stdout.write(f"Generating data at {scale:g}x")
+                        call_command('generate_data', scale=scale, seed=options['seed'], clear=True, stdout=self.stdout)
+                    key = 'existing' if scale is None else f'{scale:g}x'
+                    self.stdout.write(f"{key}: {'endpoint':<30} {'code':>4} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'peak KiB':>10}")
+                    report['scales'][key] = self._run_scale(options)
+            finally:
+                if not options['no_generate'] and not options['keep_data']:
+                    call_command('generate_data', clear_only=True, stdout=self.stdout)
+
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_remove_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentSlotBooking',
+            fields=[
+                ('AppointmentSlotBookingID', models.AutoField(primary_key=True, serialize=False)),
+                ('AppointmentDate', models.DateField()),
+                ('BookedCount', models.IntegerField(default=0)),
+                ('AppointmentSlot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='accounts.appointmentslots')),
+                ('ServiceStation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_bookings', to='accounts.servicestation')),
+            ],
+            options={
+                'unique_together': {('ServiceStation', 'AppointmentSlot', 'AppointmentDate')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_slot_bookings(apps, schema_editor):
+    # Seed booking counters for upcoming appointments made before slot capacity was tracked
+    Appointment = apps.get_model('accounts', 'Appointment')
+    AppointmentSlots = apps.get_model('accounts', 'AppointmentSlots')
+    AppointmentSlotBooking = apps.get_model('accounts', 'AppointmentSlotBooking')
+
+    slots = {
+        (slot.AppointmentDay.lower(), slot.AppointmentTime): slot
+        for slot in AppointmentSlots.objects.filter(IsDeleted=False)
+    }
+    groups = (
+        Appointment.objects.filter(IsDeleted=False, appointment_date__gte=timezone.localdate())
+        .exclude(status='cancelled')
+        .values('service_station_id', 'appointment_date', 'appointment_time')
+        .annotate(booked=Count('id'))
+    )
+
+    bookings = []
+    for group in groups:
+        slot = slots.get((group['appointment_date'].strftime('%A').lower(), group['appointment_time']))
+        if slot is not None:
+            bookings.append(AppointmentSlotBooking(
+                ServiceStation_id=group['service_station_id'],
+                AppointmentSlot_id=slot.AppointmentSlotsID,
+                AppointmentDate=group['appointment_date'],
+                BookedCount=group['booked'],
+            ))
+    AppointmentSlotBooking.objects.bulk_create(bookings, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_appointmentslotbooking'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slot_bookings, migrations.RunPython.noop),
+    ]
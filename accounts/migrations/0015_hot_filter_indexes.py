@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 16:03
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('RepairOrder', '0012_hot_filter_indexes'),
+        ('accounts', '0014_backfill_appointmentslotbooking'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['appointment_date', 'appointment_time', 'id'], name='appointment_live_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['user', 'appointment_date'], name='appointment_live_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='appointmentslots',
+            index=models.Index(condition=models.Q(('IsDeleted', False)), fields=['AppointmentDay', 'AppointmentTime'], name='slots_live_day_time_idx'),
+        ),
+    ]
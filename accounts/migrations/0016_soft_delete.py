@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='DeletedOn',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointmentslots',
+            name='DeletedOn',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('ArchivedRecordID', models.BigAutoField(primary_key=True, serialize=False)),
+                ('ModelLabel', models.CharField(max_length=100)),
+                ('ObjectID', models.CharField(max_length=64)),
+                ('Data', models.JSONField()),
+                ('DeletedOn', models.DateTimeField(blank=True, null=True)),
+                ('ArchivedOn', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ModelLabel', 'ObjectID'], name='archived_record_object_idx')],
+            },
+        ),
+    ]
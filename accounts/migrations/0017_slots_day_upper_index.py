@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 17:30
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Rebuild the index without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0016_soft_delete'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='appointmentslots',
+            name='slots_live_day_time_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='appointmentslots',
+            index=models.Index(django.db.models.functions.text.Upper('AppointmentDay'), models.F('AppointmentTime'), condition=models.Q(('IsDeleted', False)), name='slots_live_day_time_idx'),
+        ),
+    ]
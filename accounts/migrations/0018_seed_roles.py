@@ -0,0 +1,31 @@
+from django.core.management.color import no_style
+from django.db import migrations
+
+from accounts.roles import ROLE_NAMES, TECHNICIAN_ROLE_ID, TECHNICIAN_ROLE_NAME
+
+
+def seed_roles(apps, schema_editor):
+    # The technician role is the row with TECHNICIAN_ROLE_ID, so it is created
+    # first with that ID; the others are matched by name and get the next IDs
+    Roles = apps.get_model('accounts', 'Roles')
+    if not Roles.objects.filter(RoleID=TECHNICIAN_ROLE_ID).exists() and not Roles.objects.filter(RoleName=TECHNICIAN_ROLE_NAME).exists():
+        Roles.objects.create(RoleID=TECHNICIAN_ROLE_ID, RoleName=TECHNICIAN_ROLE_NAME)
+    # An explicit ID does not advance the sequence; move it past existing rows
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Roles]):
+            cursor.execute(sql)
+    for name in ROLE_NAMES:
+        if not Roles.objects.filter(RoleName__iexact=name).exists():
+            Roles.objects.create(RoleName=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_slots_day_upper_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_roles, migrations.RunPython.noop),
+    ]
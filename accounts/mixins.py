@@ -0,0 +1,46 @@
+from rest_framework.permissions import SAFE_METHODS
+
+
+def optimize_queryset(queryset, serializer_class, project=True):
+    """
+    Apply the relations and columns a serializer declares it reads.
+
+    Serializers opt in through their ``Meta``:
+
+    * ``select_related`` - forward FKs whose fields are rendered
+    * ``prefetch_related`` - reverse FKs / many-to-many relations that are rendered
+    * ``only`` - the exact columns rendered, including ``relation__field`` paths
+
+    ``project=False`` skips ``only()``, e.g. for querysets whose instances get saved.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    if meta is None:
+        return queryset
+
+    select_related = getattr(meta, 'select_related', ())
+    prefetch_related = getattr(meta, 'prefetch_related', ())
+    only = getattr(meta, 'only', ())
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if project and only:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+class OptimizedQuerySetMixin:
+    """
+    Generic view mixin that applies ``optimize_queryset`` for the view's
+    serializer class, so rendering a page costs a constant number of queries.
+    Column projection is limited to read requests.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)  # type: ignore
+        return optimize_queryset(
+            queryset,
+            self.get_serializer_class(),  # type: ignore
+            project=self.request.method in SAFE_METHODS,  # type: ignore
+        )
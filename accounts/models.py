@@ -1,6 +1,10 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
+from .geo import haversine_km
+from .softdelete import SoftDeleteModel
 # Custom User model
 class User(AbstractUser):
     phone = models.CharField(max_length=10, null=True, blank=True)
@@ -41,23 +45,12 @@ class ServiceStation(models.Model):
     def distance_to(self, lat: float, lng: float) -> float:
         """
         Calculate the Haversine distance (in km) between this station and the given lat/lng.
-        """
-        from math import radians, sin, cos, sqrt, atan2
 
+        For ranking many stations at once use ``accounts.geo.rank_by_distance``.
+        """
         if self.latitude is None or self.longitude is None:
             return float('inf')
-
-        R = 6371  # Earth radius in km
-        lat1 = radians(float(self.latitude))  # type: ignore
-        lon1 = radians(float(self.longitude))  # type: ignore
-        lat2 = radians(float(lat))  # type: ignore
-        lon2 = radians(float(lng))  # type: ignore
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        return R * c
+        return haversine_km(self.latitude, self.longitude, lat, lng)  # type: ignore
 
 class Employee(models.Model):
     EmployeeID = models.AutoField(primary_key=True)
@@ -85,7 +78,7 @@ class StationService(models.Model):
         return f"{self.station.name} - {self.service_type.name}"
 
 
-class Appointment(models.Model):
+class Appointment(SoftDeleteModel):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
@@ -104,14 +97,22 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     AppointSlotID = models.ForeignKey('AppointmentSlots', on_delete=models.CASCADE, null=True, blank=True)
-    IsDeleted = models.BooleanField(default=False)
     VehicleID = models.ForeignKey('RepairOrder.Vehicle', on_delete=models.CASCADE, null=True, blank=True , related_name='appointments_vehicle')  # type: ignore
+
+    class Meta:
+        indexes = [
+            # Appointment list (keyset order) and date/time lookups on live rows
+            models.Index(fields=['appointment_date', 'appointment_time', 'id'], condition=Q(IsDeleted=False), name='appointment_live_date_idx'),
+            # A user's live appointments
+            models.Index(fields=['user', 'appointment_date'], condition=Q(IsDeleted=False), name='appointment_live_user_idx'),
+        ]
+
     def __str__(self):
         user_str = getattr(self.user, 'username', str(self.user))
         station_str = getattr(self.service_station, 'name', str(self.service_station))
         return f"{user_str} - {station_str} - {self.appointment_date}"
 
-class AppointmentSlots(models.Model):
+class AppointmentSlots(SoftDeleteModel):
     AppointmentSlotsID = models.AutoField(primary_key=True)
     AppointmentDay=models.CharField(max_length=20)
     AppointmentTime=models.TimeField()
@@ -120,11 +121,34 @@ class AppointmentSlots(models.Model):
     CreatedAt=models.DateTimeField(auto_now_add=True)
     UpdatedAt=models.DateTimeField(auto_now=True)
     UpdatedBy=models.ForeignKey(User, on_delete=models.CASCADE, related_name='updated_slots',null=True , blank=True )
-    IsDeleted=models.BooleanField(default=False)  # type: ignore
     VehicleID = models.ForeignKey('RepairOrder.Vehicle', on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Slot lookup by day and time, and the by-day slot list. Days are
+            # matched case-insensitively (AppointmentDay__iexact), hence UPPER()
+            models.Index(Upper('AppointmentDay'), F('AppointmentTime'), condition=Q(IsDeleted=False), name='slots_live_day_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.AppointmentDay} at {self.AppointmentTime}"
+
+class AppointmentSlotBooking(models.Model):
+    """
+    Booked-appointment counter for one slot at one station on one date.
+    Maintained by accounts.booking so capacity checks never need a COUNT(*).
+    """
+    AppointmentSlotBookingID = models.AutoField(primary_key=True)
+    ServiceStation = models.ForeignKey(ServiceStation, on_delete=models.CASCADE, related_name='slot_bookings')
+    AppointmentSlot = models.ForeignKey(AppointmentSlots, on_delete=models.CASCADE, related_name='bookings')
+    AppointmentDate = models.DateField()
+    BookedCount = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['ServiceStation', 'AppointmentSlot', 'AppointmentDate']
+
+    def __str__(self):
+        return f"{self.ServiceStation_id} - {self.AppointmentSlot} on {self.AppointmentDate}: {self.BookedCount}"
     
 class Roles(models.Model):
     RoleID = models.AutoField(primary_key=True)
@@ -140,4 +164,20 @@ class UserRole(models.Model):
     AssignedOn = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.User.username} - {self.Role.RoleName}"
\ No newline at end of file
+        return f"{self.User.username} - {self.Role.RoleName}"
+class ArchivedRecord(models.Model):
+    # Soft-deleted rows moved out of their tables by the purge_deleted command
+    ArchivedRecordID = models.BigAutoField(primary_key=True)
+    ModelLabel = models.CharField(max_length=100)
+    ObjectID = models.CharField(max_length=64)
+    Data = models.JSONField()
+    DeletedOn = models.DateTimeField(null=True, blank=True)
+    ArchivedOn = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ModelLabel', 'ObjectID'], name='archived_record_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ModelLabel} {self.ObjectID}"
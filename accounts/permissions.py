@@ -1,13 +1,21 @@
 from rest_framework.permissions import BasePermission
 
-class IsAdmin(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'admin'
+from .roles import Role, has_role
 
-class IsServiceStation(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'stations'
+class HasRole(BasePermission):
+    role = Role.NONE
 
-class IsUser(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'user'
+        return request.user.is_authenticated and has_role(request.user, self.role)
+
+class IsAdmin(HasRole):
+    role = Role.ADMIN
+
+class IsServiceStation(HasRole):
+    role = Role.SERVICE_STATION
+
+class IsUser(HasRole):
+    role = Role.USER
+
+class IsTechnician(HasRole):
+    role = Role.TECHNICIAN
@@ -0,0 +1,275 @@
+"""
+Request profiling.
+
+ProfilingMiddleware measures, for every request, the wall time, the number
+and total time of SQL queries, the time spent serializing instances and the
+time spent rendering the response body. Each response carries the numbers in
+a ``Server-Timing`` header, with ``app`` the rest of the request's time (auth,
+view code, middleware). Samples are kept per URL name (e.g.
+``appointment-list``) in a rolling in-process window that MetricsView exposes.
+Requests over their query or time budget are logged as warnings on the
+``accounts.profiling`` logger, which is how N+1 regressions show up. Budgets
+are set per method and URL name (``'GET appointment-list'``), since a POST
+to a list URL does far more work than the GET.
+
+Nothing in Django or DRF is patched. Queries are timed by an execute wrapper
+added to every database connection when it opens (``install_query_timing``),
+serialization by serializers that opt in with TimedSerializerMixin, and
+rendering by TimedJSONRenderer, the default DRF JSON renderer. Queries run
+while serializing (lazy relations) count as db time, not serializer time.
+Everything reports to the current request through a context variable, which
+also reaches the threads ``sync_to_async`` runs ORM calls in, so async views
+under ASGI are measured the same way. The middleware is sync and async
+capable and never forces an async request onto a thread.
+
+Configured by settings.PROFILING (see DEFAULTS). Metrics are per process.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WINDOW': 1000,           # samples kept per URL name
+    'QUERY_BUDGET': 25,       # default budgets, per request
+    'TIME_BUDGET_MS': 1000,
+    'BUDGETS': {},            # {'METHOD url_name': {'queries': n, 'time_ms': ms}}
+}
+CONFIG = {**DEFAULTS, **getattr(settings, 'PROFILING', {})}
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open-ended
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializer_db_time', 'serializing', 'render_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_db_time = 0.0  # part of db_time spent while serializing
+        self.serializing = False
+        self.render_time = 0.0
+
+    @property
+    def serializer_only_time(self):
+        return max(self.serializer_time - self.serializer_db_time, 0.0)
+
+
+def time_query(execute, sql, params, many, context):
+    # Database execute wrapper; a no-op outside a profiled request
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        profile.db_time += elapsed
+        profile.queries += 1
+        if profile.serializing:
+            profile.serializer_db_time += elapsed
+
+
+def install_query_timing(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver, connected in AppConfig.ready().
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin that adds the time spent turning instances into
+    primitive data to the request being profiled. Only the outermost call is
+    timed, so nested and ``many=True`` serializers are not counted twice.
+    """
+
+    def to_representation(self, instance):
+        profile = _current.get()
+        if profile is None or profile.serializing:
+            return super().to_representation(instance)
+        profile.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            profile.serializer_time += time.perf_counter() - start
+            profile.serializing = False
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that adds its render time to the request being profiled.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        profile = _current.get()
+        if profile is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            profile.render_time += time.perf_counter() - start
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list (0.0 when empty). Also
+    used by the loadtest and run_benchmarks commands.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class MetricsStore:
+    """
+    Rolling window of ``(wall_ms, db_ms, queries, serializer_ms, render_ms)``
+    samples per URL name.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, sample) -> None:
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(sample)
+            self._totals[name] = self._totals.get(name, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            totals = dict(self._totals)
+
+        report = {}
+        for name, values in sorted(samples.items()):
+            wall = sorted(sample[0] for sample in values)
+            buckets = [0] * (len(BUCKETS_MS) + 1)
+            for value in wall:
+                buckets[bisect.bisect_left(BUCKETS_MS, value)] += 1
+            count = len(values)
+            report[name] = {
+                'requests_total': totals[name],
+                'window': count,
+                'wall_ms': {
+                    'mean': sum(wall) / count,
+                    'p50': percentile(wall, 50),
+                    'p95': percentile(wall, 95),
+                    'p99': percentile(wall, 99),
+                    'max': wall[-1],
+                },
+                'db_ms_mean': sum(sample[1] for sample in values) / count,
+                'queries_mean': sum(sample[2] for sample in values) / count,
+                'queries_max': max(sample[2] for sample in values),
+                'serializer_ms_mean': sum(sample[3] for sample in values) / count,
+                'render_ms_mean': sum(sample[4] for sample in values) / count,
+                'app_ms_mean': sum(max(sample[0] - sum(sample[i] for i in (1, 3, 4)), 0.0) for sample in values) / count,
+                'histogram_ms': {
+                    **{f'le_{bound}': buckets[i] for i, bound in enumerate(BUCKETS_MS)},
+                    f'gt_{BUCKETS_MS[-1]}': buckets[-1],
+                },
+            }
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+
+metrics = MetricsStore(CONFIG['WINDOW'])
+
+
+def _budget(method, name):
+    budget = CONFIG['BUDGETS'].get(f'{method} {name}', {})
+    return budget.get('queries', CONFIG['QUERY_BUDGET']), budget.get('time_ms', CONFIG['TIME_BUDGET_MS'])
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not CONFIG['ENABLED']:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile, start)
+
+    async def __acall__(self, request):
+        if not CONFIG['ENABLED']:
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile, start)
+
+    def finish(self, request, response, profile, start):
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = profile.db_time * 1000
+        serializer_ms = profile.serializer_only_time * 1000
+        render_ms = profile.render_time * 1000
+        app_ms = max(wall_ms - db_ms - serializer_ms - render_ms, 0.0)
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{profile.queries} queries", '
+            f'serialize;dur={serializer_ms:.1f}, '
+            f'render;dur={render_ms:.1f}, '
+            f'app;dur={app_ms:.1f}, '
+            f'total;dur={wall_ms:.1f}'
+        )
+
+        match = getattr(request, 'resolver_match', None)
+        name = match.view_name if match is not None and match.url_name else None
+        if name:
+            metrics.record(name, (wall_ms, db_ms, profile.queries, serializer_ms, render_ms))
+            query_budget, time_budget = _budget(request.method, name)
+            if profile.queries > query_budget or wall_ms > time_budget:
+                logger.warning(
+                    "Budget exceeded on %s %s (%s): %d queries (budget %d), %.1f ms (budget %d ms), "
+                    "db %.1f ms, serialize %.1f ms, render %.1f ms, app %.1f ms",
+                    request.method, request.path, name, profile.queries, query_budget,
+                    wall_ms, time_budget, db_ms, serializer_ms, render_ms, app_ms,
+                )
+        return response
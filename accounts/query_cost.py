@@ -0,0 +1,107 @@
+"""
+Static cost and depth limits for GraphQL documents.
+
+QueryCostRule runs during validation, before anything executes. Every field
+costs 1, and a list field multiplies the cost of its selection by the number
+of rows it can return (its ``limit`` argument, or the page size caps below).
+Documents that are too deep or too expensive are rejected with a validation
+error. Introspection fields are not counted.
+"""
+from django.conf import settings
+from graphql import GraphQLError
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, IntValueNode
+from graphql.type import get_named_type, get_nullable_type, is_list_type
+from graphql.validation import ValidationRule
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+LIMITS = {
+    'MAX_DEPTH': 8,
+    'MAX_COST': 5000,
+    **getattr(settings, 'GRAPHQL_QUERY_LIMITS', {}),
+}
+
+
+def page_bounds(limit, offset):
+    """
+    Clamp ``limit`` / ``offset`` arguments of a paginated list field.
+    """
+    limit = DEFAULT_PAGE_SIZE if limit is None else max(0, min(limit, MAX_PAGE_SIZE))
+    offset = max(0, offset or 0)
+    return offset, offset + limit
+
+
+class QueryCostRule(ValidationRule):
+
+    def enter_operation_definition(self, node, *_args):
+        root_type = self.context.schema.get_root_type(node.operation)
+        if root_type is None:
+            return
+        cost, depth = self._measure(node.selection_set, root_type, 1, frozenset())
+        name = node.name.value if node.name else 'anonymous'
+
+        if depth > LIMITS['MAX_DEPTH']:
+            self.report_error(GraphQLError(
+                f"Operation '{name}' has depth {depth}, which exceeds the maximum depth of {LIMITS['MAX_DEPTH']}.",
+                node,
+            ))
+        if cost > LIMITS['MAX_COST']:
+            self.report_error(GraphQLError(
+                f"Operation '{name}' has an estimated cost of {cost}, which exceeds the maximum cost of "
+                f"{LIMITS['MAX_COST']}. Request fewer fields or use smaller 'limit' arguments.",
+                node,
+            ))
+
+    def _list_size(self, node, field_def):
+        if 'limit' not in field_def.args:
+            return MAX_PAGE_SIZE
+        for argument in node.arguments:
+            if argument.name.value == 'limit':
+                # Variables are unknown at validation time, so assume the worst case
+                if isinstance(argument.value, IntValueNode):
+                    return max(0, min(int(argument.value.value), MAX_PAGE_SIZE))
+                return MAX_PAGE_SIZE
+        return DEFAULT_PAGE_SIZE
+
+    def _measure(self, selection_set, parent_type, depth, fragments):
+        """
+        Return ``(cost, max_depth)`` of a selection set whose fields sit at ``depth``.
+        """
+        cost, max_depth = 0, depth
+        schema = self.context.schema
+
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                name = selection.name.value
+                field_def = getattr(parent_type, 'fields', {}).get(name)
+                if name.startswith('__') or field_def is None:
+                    continue  # introspection, or an unknown field reported by the standard rules
+
+                child_cost = 0
+                if selection.selection_set:
+                    child_cost, child_depth = self._measure(
+                        selection.selection_set, get_named_type(field_def.type), depth + 1, fragments
+                    )
+                    max_depth = max(max_depth, child_depth)
+
+                multiplier = self._list_size(selection, field_def) if is_list_type(get_nullable_type(field_def.type)) else 1
+                cost += 1 + multiplier * child_cost
+
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = schema.get_type(selection.type_condition.name.value) if selection.type_condition else parent_type
+                fragment_cost, fragment_depth = self._measure(selection.selection_set, fragment_type, depth, fragments)
+                cost += fragment_cost
+                max_depth = max(max_depth, fragment_depth)
+
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.context.get_fragment(name)
+                if fragment is None or name in fragments:
+                    continue  # unknown or cyclic fragments are reported by the standard rules
+                fragment_type = schema.get_type(fragment.type_condition.name.value)
+                fragment_cost, fragment_depth = self._measure(fragment.selection_set, fragment_type, depth, fragments | {name})
+                cost += fragment_cost
+                max_depth = max(max_depth, fragment_depth)
+
+        return cost, max_depth
@@ -0,0 +1,121 @@
+"""
+Role resolution.
+
+A user's roles are resolved once into a ``Role`` bitmask: one query on a cold
+cache, then read from the shared cache and memoised on the user object for
+the rest of the request, so every role check is a single bit test. The set of
+users holding a role (e.g. all technicians) is cached the same way for
+queries that filter by role.
+
+Roles are matched by ``Roles.RoleName`` (case-insensitive) via ROLE_NAMES,
+except the technician role, which has always been the ``Roles`` row with
+``RoleID = TECHNICIAN_ROLE_ID`` whatever it is named (see ROLE_IDS). Migration
+0018_seed_roles creates that row and the named roles, so no code path needs
+to create a role on the fly (and a row created by name can never take
+TECHNICIAN_ROLE_ID). UserRole / Roles changes invalidate the cached entries;
+with a per-process cache that only reaches the current worker, so there
+entries expire after ROLES_LOCAL_CACHE_TIMEOUT seconds instead.
+"""
+import enum
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .caching import cache_is_shared
+
+ROLES_CACHE_KEY = 'accounts:user-roles:{}'
+ROLE_MEMBERS_CACHE_KEY = 'accounts:role-members:{}'
+ROLES_CACHE_TIMEOUT = 300
+ROLES_LOCAL_CACHE_TIMEOUT = 5
+
+
+def roles_cache_timeout() -> int:
+    return ROLES_CACHE_TIMEOUT if cache_is_shared() else ROLES_LOCAL_CACHE_TIMEOUT
+
+
+class Role(enum.IntFlag):
+    NONE = 0
+    ADMIN = 1
+    SERVICE_STATION = 2
+    USER = 4
+    TECHNICIAN = 8
+
+
+ROLE_NAMES = {
+    'admin': Role.ADMIN,
+    'stations': Role.SERVICE_STATION,
+    'user': Role.USER,
+}
+TECHNICIAN_ROLE_ID = 1
+TECHNICIAN_ROLE_NAME = 'Technician'  # name the seeded row gets; not used for matching
+ROLE_IDS = {
+    TECHNICIAN_ROLE_ID: Role.TECHNICIAN,
+}
+ALL_ROLES = (*ROLE_NAMES.values(), *ROLE_IDS.values())
+
+
+def role_mask(roles) -> Role:
+    """
+    Bitmask of ``(RoleID, RoleName)`` pairs.
+    """
+    mask = Role.NONE
+    for role_id, name in roles:
+        mask |= ROLE_IDS[role_id] if role_id in ROLE_IDS else ROLE_NAMES.get(name.lower(), Role.NONE)
+    return mask
+
+
+def _load_role_mask(user_id) -> int:
+    from .models import UserRole
+
+    return int(role_mask(UserRole.objects.filter(User_id=user_id).values_list('Role_id', 'Role__RoleName')))  # type: ignore
+
+
+def get_user_roles(user) -> Role:
+    """
+    Bitmask of the roles held by ``user`` (``Role.NONE`` for anonymous users).
+    """
+    if user is None or not user.is_authenticated:
+        return Role.NONE
+
+    mask = getattr(user, '_role_mask', None)
+    if mask is None:
+        key = ROLES_CACHE_KEY.format(user.pk)
+        mask = cache.get(key)
+        if mask is None:
+            mask = _load_role_mask(user.pk)
+            cache.set(key, mask, roles_cache_timeout())
+        mask = Role(mask)
+        user._role_mask = mask
+    return mask
+
+
+def has_role(user, role: Role) -> bool:
+    return bool(get_user_roles(user) & role)
+
+
+def role_members(role: Role) -> frozenset:
+    """
+    IDs of the users holding ``role``, for filters such as
+    ``Employee.objects.filter(User_id__in=role_members(Role.TECHNICIAN))``.
+    """
+    from .models import UserRole
+
+    key = ROLE_MEMBERS_CACHE_KEY.format(int(role))
+    members = cache.get(key)
+    if members is None:
+        condition = Q(pk__in=[])
+        for name, bit in ROLE_NAMES.items():
+            if bit & role:
+                condition |= Q(Role__RoleName__iexact=name) & ~Q(Role_id__in=ROLE_IDS)
+        for role_id, bit in ROLE_IDS.items():
+            if bit & role:
+                condition |= Q(Role_id=role_id)
+        members = frozenset(UserRole.objects.filter(condition).values_list('User_id', flat=True))  # type: ignore
+        cache.set(key, members, roles_cache_timeout())
+    return members
+
+
+def invalidate_user_roles(user_ids) -> None:
+    keys = [ROLES_CACHE_KEY.format(user_id) for user_id in user_ids]
+    keys += [ROLE_MEMBERS_CACHE_KEY.format(int(role)) for role in ALL_ROLES]
+    cache.delete_many(keys)
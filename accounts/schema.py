@@ -1,6 +1,10 @@
 import graphene 
 from graphene_django import DjangoObjectType
 from .models import Appointment, ServiceStation, ServiceType, User
+from .loaders import get_loaders
+from .query_cost import page_bounds
+from .booking import SlotFullError, booking_key, find_slot, release_slot, sync_booking
+from django.db import transaction
 from django.utils import timezone
 from datetime import datetime
 
@@ -20,11 +24,24 @@ class AppointmentType(DjangoObjectType):
             "updated_at"
         )
 
+    # Relations resolve through the request's batch loaders (one IN query per relation)
+    def resolve_user(self, info):
+        return get_loaders(info.context).users.load(self.user_id)
+
+    def resolve_service_station(self, info):
+        return get_loaders(info.context).stations.load(self.service_station_id)
+
+    def resolve_service_type(self, info):
+        return get_loaders(info.context).service_types.load(self.service_type_id)
+
 class ServiceStationType(DjangoObjectType):
     class Meta:
         model = ServiceStation
         fields = ("id", "name", "address", "phone", "email", "is_active","owner")
 
+    def resolve_owner(self, info):
+        return get_loaders(info.context).users.load(self.owner_id)
+
 class ServiceTypeType(DjangoObjectType):
     class Meta:
         model = ServiceType
@@ -33,7 +50,9 @@ class ServiceTypeType(DjangoObjectType):
 class UserType(DjangoObjectType):
     class Meta:
         model = User
-        fields = ("id", "username", "email", "role", "phone")
+        fields = ("id", "username", "email", "phone")
+
+SLOT_FULL_MESSAGE = "This appointment slot is fully booked. Please select another slot."
 
 class CreateAppointmentMutation(graphene.Mutation):
     class Arguments:
@@ -93,16 +112,32 @@ class CreateAppointmentMutation(graphene.Mutation):
                     errors=["Appointment date cannot be in the past"]
                 )
 
-            # Create the appointment
-            appointment = Appointment.objects.create(
-                user=user_obj,
-                service_station=station,
-                service_type=service,
-                appointment_date=appointment_date,
-                appointment_time=appointment_time,
-                status=status,
-                notes=notes or ""
-            )
+            slot = find_slot(appointment_date, appointment_time)
+            if slot is None:
+                return CreateAppointmentMutation(
+                    success=False,
+                    errors=["No appointment slot available for this day and time."]
+                )
+
+            # Create the appointment and take its place in the slot together
+            try:
+                with transaction.atomic():
+                    appointment = Appointment.objects.create(
+                        user=user_obj,
+                        service_station=station,
+                        service_type=service,
+                        appointment_date=appointment_date,
+                        appointment_time=appointment_time,
+                        status=status,
+                        notes=notes or "",
+                        AppointSlotID=slot
+                    )
+                    sync_booking(None, appointment)
+            except SlotFullError:
+                return CreateAppointmentMutation(
+                    success=False,
+                    errors=[SLOT_FULL_MESSAGE]
+                )
 
             return CreateAppointmentMutation(
                 appointment=appointment,
@@ -212,10 +247,27 @@ class UpdateAppointmentMutation(graphene.Mutation):
                         errors=["Service type not found"]
                     )
 
-            # Update the appointment
-            for field, value in kwargs.items():
-                setattr(appointment, field, value)
-            appointment.save()
+            # Update the appointment and move its slot place in one transaction
+            try:
+                with transaction.atomic():
+                    before = booking_key(appointment)
+                    for field, value in kwargs.items():
+                        setattr(appointment, field, value)
+                    if 'appointment_date' in kwargs or 'appointment_time' in kwargs:
+                        slot = find_slot(appointment.appointment_date, appointment.appointment_time)
+                        if slot is None:
+                            return UpdateAppointmentMutation(
+                                success=False,
+                                errors=["No appointment slot available for this day and time."]
+                            )
+                        appointment.AppointSlotID = slot
+                    appointment.save()
+                    sync_booking(before, appointment)
+            except SlotFullError:
+                return UpdateAppointmentMutation(
+                    success=False,
+                    errors=[SLOT_FULL_MESSAGE]
+                )
 
             return UpdateAppointmentMutation(
                 appointment=appointment,
@@ -239,7 +291,11 @@ class DeleteAppointmentMutation(graphene.Mutation):
     def mutate(self, info, id):
         try:
             appointment = Appointment.objects.get(id=id)
-            appointment.delete()
+            with transaction.atomic():
+                before = booking_key(appointment)
+                appointment.delete()
+                if before is not None:
+                    release_slot(*before)
             return DeleteAppointmentMutation(
                 success=True,
                 errors=[]
@@ -255,25 +311,36 @@ class DeleteAppointmentMutation(graphene.Mutation):
                 errors=[str(e)]
             )
 
+def page(queryset, limit, offset):
+    # Every list field is paginated; QueryCostRule prices it by the same limit
+    start, end = page_bounds(limit, offset)
+    return list(queryset.order_by('id')[start:end])
+
 class Query(graphene.ObjectType):
-    appointments = graphene.List(AppointmentType)
+    appointments = graphene.List(AppointmentType, limit=graphene.Int(), offset=graphene.Int())
     appointment = graphene.Field(AppointmentType, id=graphene.Int(required=True))
-    user_appointments = graphene.List(AppointmentType, user_id=graphene.Int(required=True))
-    station_appointments = graphene.List(AppointmentType, station_id=graphene.Int(required=True))
-    service_stations = graphene.List(ServiceStationType)
+    user_appointments = graphene.List(AppointmentType, user_id=graphene.Int(required=True), limit=graphene.Int(), offset=graphene.Int())
+    station_appointments = graphene.List(AppointmentType, station_id=graphene.Int(required=True), limit=graphene.Int(), offset=graphene.Int())
+    service_stations = graphene.List(ServiceStationType, limit=graphene.Int(), offset=graphene.Int())
     service_station=graphene.Field(ServiceStationType,id=graphene.Int(required=True))
-    active_service_stations=graphene.List(ServiceStationType)
-    def resolve_service_stations(self,info):
-        return ServiceStation.objects.all()
-    def resolve_active_service_stations(self,info):
-        return ServiceStation.objects.filter(is_active=True)
+    active_service_stations=graphene.List(ServiceStationType, limit=graphene.Int(), offset=graphene.Int())
+    def resolve_service_stations(self,info,limit=None,offset=None):
+        stations = page(ServiceStation.objects.all(), limit, offset)
+        get_loaders(info.context).prime_stations(stations)
+        return stations
+    def resolve_active_service_stations(self,info,limit=None,offset=None):
+        stations = page(ServiceStation.objects.filter(is_active=True), limit, offset)
+        get_loaders(info.context).prime_stations(stations)
+        return stations
     def resolve_service_station(self,info,id):
         try:
             return ServiceStation.objects.get(id=id)
         except ServiceStation.DoesNotExist:
             return None
-    def resolve_appointments(self, info):
-        return Appointment.objects.all()
+    def resolve_appointments(self, info, limit=None, offset=None):
+        appointments = page(Appointment.objects.all(), limit, offset)
+        get_loaders(info.context).prime_appointments(appointments)
+        return appointments
 
     def resolve_appointment(self, info, id):
         try:
@@ -281,11 +348,15 @@ class Query(graphene.ObjectType):
         except Appointment.DoesNotExist:
             return None
 
-    def resolve_user_appointments(self, info, user_id):
-        return Appointment.objects.filter(user_id=user_id)
+    def resolve_user_appointments(self, info, user_id, limit=None, offset=None):
+        appointments = page(Appointment.objects.filter(user_id=user_id), limit, offset)
+        get_loaders(info.context).prime_appointments(appointments)
+        return appointments
 
-    def resolve_station_appointments(self, info, station_id):
-        return Appointment.objects.filter(service_station_id=station_id)
+    def resolve_station_appointments(self, info, station_id, limit=None, offset=None):
+        appointments = page(Appointment.objects.filter(service_station_id=station_id), limit, offset)
+        get_loaders(info.context).prime_appointments(appointments)
+        return appointments
 
 class AddServiceType(graphene.Mutation):
     class Arguments:
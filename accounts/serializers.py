@@ -1,9 +1,15 @@
 from rest_framework import serializers
 from .models import User, ServiceType, ServiceStation, Appointment, StationService
-from .models import AppointmentSlots
+from .models import AppointmentSlots, Roles, UserRole
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from RepairOrder.models import Vehicle
-class AppointmentSlotsSerializer(serializers.ModelSerializer):
+from .booking import SlotFullError, find_slot, reserve_slot
+from .catalog import get_catalog
+from .profiling import TimedSerializerMixin
+from .roles import ROLE_IDS
+class AppointmentSlotsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AppointmentSlots
         fields = (
@@ -13,29 +19,52 @@ class AppointmentSlotsSerializer(serializers.ModelSerializer):
             "MaxAppointments",
         )
 
+class SlotAvailabilitySerializer(serializers.Serializer):
+    AppointmentSlotsID = serializers.IntegerField()
+    AppointmentTime = serializers.TimeField()
+    MaxAppointments = serializers.IntegerField()
+    Booked = serializers.IntegerField()
+    Remaining = serializers.IntegerField()
+
+class AppointmentAvailabilitySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    slots = SlotAvailabilitySerializer(many=True)
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
+    # Self-registration can only pick the customer or station-owner role
+    role = serializers.ChoiceField(choices=['user', 'stations'], default='user', write_only=True)
 
     class Meta:
         model = User
         fields = ('username', 'email', 'password', 'role')
 
+    def validate_role(self, value):
+        # Roles are seeded by migration, never created here: a row created on
+        # the fly could take the technician RoleID
+        role = Roles.objects.filter(RoleName__iexact=value).exclude(RoleID__in=ROLE_IDS).first()
+        if role is None:
+            raise serializers.ValidationError(f"The '{value}' role is not set up.")
+        return role
+
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
-            role=validated_data.get('role', 'user')
-        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=validated_data['username'],
+                email=validated_data['email'],
+                password=validated_data['password'],
+            )
+            UserRole.objects.create(User=user, Role=validated_data['role'])
         return user
 
-class ServiceTypeSerializer(serializers.ModelSerializer):
+class ServiceTypeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ServiceType
         fields = '__all__'
 
-class ServiceStationSerializer(serializers.ModelSerializer):
-    services_offered = ServiceTypeSerializer(many=True, read_only=True)
+class ServiceStationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Rendered from the cached catalog; only the related IDs come from the station
+    services_offered = serializers.SerializerMethodField()
     latitude = serializers.FloatField(read_only=True)
     longitude = serializers.FloatField(read_only=True)
     
@@ -43,6 +72,28 @@ class ServiceStationSerializer(serializers.ModelSerializer):
         model = ServiceStation
         fields = '__all__'
         read_only_fields = ('owner',)
+        prefetch_related = (Prefetch('services_offered', queryset=ServiceType.objects.only('id')),)  # type: ignore
+
+    def service_catalog(self):
+        # Callers may pass the catalog in the context (e.g. async views, which cannot load it here).
+        # Otherwise it is read once per serialization: with a shared cache every
+        # get_catalog() is a network round trip, and lists render many stations
+        catalog = self.context.get('catalog')
+        if catalog is None:
+            catalog = self.context['catalog'] = get_catalog()
+        return catalog
+
+    def get_services_offered(self, obj):
+        catalog = self.service_catalog()
+        return [catalog[service.pk] for service in obj.services_offered.all() if service.pk in catalog]
+
+class ServiceStationCompactSerializer(ServiceStationSerializer):
+    """
+    Station with ``services_offered`` as a list of service type IDs; the view
+    sends the referenced catalog entries once alongside the stations.
+    """
+    def get_services_offered(self, obj):
+        return [service.pk for service in obj.services_offered.all()]
 
 class ServiceStationCreateSerializer(serializers.ModelSerializer):
     latitude = serializers.FloatField(write_only=True, required=False)
@@ -76,7 +127,7 @@ class ServiceStationCreateSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     service_station_name = serializers.CharField(source='service_station.name', read_only=True)
     service_type_name = serializers.CharField(source='service_type.name', read_only=True)
     user_name = serializers.CharField(source='user.username', read_only=True)
@@ -99,7 +150,45 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "user_name",
             "status"
         ]
-        read_only_fields = ('user',)
+        # The slot always follows appointment_date / appointment_time, see validate()
+        read_only_fields = ('user', 'AppointSlotID')
+        select_related = ('service_station', 'service_type', 'user', 'VehicleID')
+        only = (
+            "id",
+            "service_station__name",
+            "service_type__name",
+            "notes",
+            "VehicleID__PlateNumber",
+            "VehicleID__VIN",
+            "AppointSlotID",
+            "appointment_date",
+            "appointment_time",
+            "user__username",
+            "status",
+        )
+
+    def validate(self, attrs):
+        if 'appointment_date' not in attrs and 'appointment_time' not in attrs:
+            return attrs
+
+        appointment_date = attrs.get('appointment_date', getattr(self.instance, 'appointment_date', None))
+        appointment_time = attrs.get('appointment_time', getattr(self.instance, 'appointment_time', None))
+        if appointment_date is None or appointment_time is None:
+            raise serializers.ValidationError("Both appointment_date and appointment_time are required.")
+
+        if 'appointment_date' in attrs and appointment_date < timezone.localdate():
+            raise serializers.ValidationError(
+                {"appointment_date": "Appointment date must be today or a future date."}
+            )
+
+        # Rescheduling re-resolves the slot; capacity is reserved by the view's sync_booking()
+        slot = find_slot(appointment_date, appointment_time)
+        if not slot:
+            raise serializers.ValidationError(
+                "No appointment slot available for this day and time."
+            )
+        attrs['AppointSlotID'] = slot
+        return attrs
 
 class AppointmentCreateSerializer(serializers.ModelSerializer):
     plate_number = serializers.CharField(write_only=True)
@@ -122,22 +211,34 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         vin = validated_data.pop('vin')
 
-        vehicle, created = Vehicle.objects.get_or_create(
-            VIN=vin,
-            PlateNumber=plate_number,
-            CreatedBy=user,
-            defaults={'IsActive': True}
-        )
-        appointment = Appointment.objects.create(
-            user=user,
-            service_station=validated_data['service_station'],
-            service_type=validated_data['service_type'],
-            appointment_date=validated_data['appointment_date'],
-            appointment_time=validated_data['appointment_time'],
-            notes=validated_data.get('notes', ''),
-            AppointSlotID=validated_data.get('AppointSlotID', None),
-            VehicleID=vehicle
-        )
+        with transaction.atomic():
+            try:
+                reserve_slot(
+                    validated_data['service_station'],
+                    validated_data['AppointSlotID'],
+                    validated_data['appointment_date'],
+                )
+            except SlotFullError:
+                raise serializers.ValidationError(
+                    "This appointment slot is fully booked. Please select another slot."
+                )
+
+            vehicle, created = Vehicle.objects.get_or_create(
+                VIN=vin,
+                PlateNumber=plate_number,
+                CreatedBy=user,
+                defaults={'IsActive': True}
+            )
+            appointment = Appointment.objects.create(
+                user=user,
+                service_station=validated_data['service_station'],
+                service_type=validated_data['service_type'],
+                appointment_date=validated_data['appointment_date'],
+                appointment_time=validated_data['appointment_time'],
+                notes=validated_data.get('notes', ''),
+                AppointSlotID=validated_data.get('AppointSlotID', None),
+                VehicleID=vehicle
+            )
         
         return appointment 
 
@@ -153,33 +254,15 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
                 {"appointment_date": "Appointment date must be today or a future date."}
             )
 
-        # 2. Get day name from date
-        appoint_day = appointment_date.strftime('%A')
-
-        # 3. Check if slot exists
-        slot = AppointmentSlots.objects.filter(
-            AppointmentDay=appoint_day,
-            AppointmentTime=appointment_time,
-            IsDeleted=False
-        ).first()
+        # 2. Check if slot exists
+        slot = find_slot(appointment_date, appointment_time)
 
         if not slot:
             raise serializers.ValidationError(
                 "No appointment slot available for this day and time."
             )
 
-        # 4. Count existing appointments for that date + time
-        existing_count = Appointment.objects.filter(
-            appointment_date=appointment_date,
-            appointment_time=appointment_time
-        ).count()
-
-        if existing_count >= 3:
-            raise serializers.ValidationError(
-            "This appointment slot is fully booked. Please select another slot."
-        )
-
-    # Optionally, set the slot in attrs for use in create()
+        # 3. Capacity (slot.MaxAppointments per station) is reserved atomically in create()
         attrs['AppointSlotID'] = slot
 
         return attrs
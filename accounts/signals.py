@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from oauth2_provider.models import AccessToken
+
+from .authentication import invalidate_tokens
+from .catalog import bump_catalog_version
+from .geo import station_index
+from .models import Roles, ServiceStation, ServiceType, User, UserRole
+from .roles import invalidate_user_roles
+
+# Invalidation runs on commit so a concurrent reader cannot rebuild a cache
+# entry for the new version from data that is not committed yet.
+
+
+@receiver(post_save, sender=ServiceStation)
+@receiver(post_delete, sender=ServiceStation)
+def invalidate_station_index(sender, instance, **kwargs):
+    transaction.on_commit(station_index.invalidate)
+
+
+@receiver(m2m_changed, sender=ServiceStation.services_offered.through)
+def touch_station_services(sender, instance, action, reverse, pk_set, **kwargs):
+    # A station's updated_at versions its cached representation (see accounts.http_cache)
+    if reverse:
+        # instance is a ServiceType; a clear has no pk_set afterwards
+        if action == 'pre_clear':
+            station_ids = list(instance.stations.values_list('pk', flat=True))
+        elif action in ('post_add', 'post_remove'):
+            station_ids = list(pk_set)
+        else:
+            return
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        station_ids = [instance.pk]
+    else:
+        return
+    ServiceStation.objects.filter(pk__in=station_ids).update(updated_at=timezone.now())  # type: ignore
+
+
+@receiver(post_save, sender=ServiceType)
+@receiver(post_delete, sender=ServiceType)
+def invalidate_service_type_catalog(sender, instance, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=AccessToken)
+@receiver(post_delete, sender=AccessToken)
+def invalidate_cached_token(sender, instance, **kwargs):
+    # Revoking a token deletes it
+    checksum = instance.token_checksum
+    transaction.on_commit(lambda: invalidate_tokens([checksum]))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    # Cached tokens carry a copy of the user (is_active, permissions, ...)
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    checksums = list(AccessToken.objects.filter(user=instance).values_list('token_checksum', flat=True))
+    if checksums:
+        transaction.on_commit(lambda: invalidate_tokens(checksums))
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_cached_user_roles(sender, instance, **kwargs):
+    user_id = instance.User_id
+    transaction.on_commit(lambda: invalidate_user_roles([user_id]))
+
+
+@receiver(post_save, sender=Roles)
+@receiver(post_delete, sender=Roles)
+def invalidate_role_holders(sender, instance, **kwargs):
+    user_ids = list(UserRole.objects.filter(Role_id=instance.pk).values_list('User_id', flat=True))  # type: ignore
+    if user_ids:
+        transaction.on_commit(lambda: invalidate_user_roles(user_ids))
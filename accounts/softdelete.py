@@ -0,0 +1,61 @@
+"""
+Soft deletion.
+
+Models inheriting SoftDeleteModel keep deleted rows with ``IsDeleted = True``
+and the time of deletion in ``DeletedOn``. ``objects`` only returns live rows
+(and so do reverse relations such as ``job_card.concerns``); ``all_objects``
+includes deleted ones. ``delete()`` on an instance or a queryset marks rows
+deleted, ``hard_delete()`` removes them. Live-row lookups are served by
+partial indexes on ``IsDeleted = false``. Old deleted rows are archived and
+removed by the ``purge_deleted`` management command.
+
+Queryset ``delete()`` is a single UPDATE and sends no model signals.
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+
+    def delete(self):
+        return self.update(IsDeleted=True, DeletedOn=timezone.now())
+
+    delete.alters_data = True
+
+    def hard_delete(self):
+        return super().delete()
+
+    hard_delete.alters_data = True
+
+    def alive(self):
+        return self.filter(IsDeleted=False)
+
+    def dead(self):
+        return self.filter(IsDeleted=True)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+
+    def get_queryset(self):
+        return super().get_queryset().filter(IsDeleted=False)
+
+
+class SoftDeleteModel(models.Model):
+    IsDeleted = models.BooleanField(default=False)
+    DeletedOn = models.DateTimeField(null=True, blank=True)
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
+
+    def delete(self, using=None, keep_parents=False):
+        # A save, not a DELETE: post_save receivers see IsDeleted change
+        self.IsDeleted = True
+        self.DeletedOn = timezone.now()
+        self.save(using=using, update_fields=['IsDeleted', 'DeletedOn'])
+        return 1, {self._meta.label: 1}
+
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using=using, keep_parents=keep_parents)
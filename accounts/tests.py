@@ -1,3 +1,717 @@
-from django.test import TestCase
+import datetime
+import json
+import tempfile
+import time
+from base64 import b64encode
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.management.color import no_style
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from oauth2_provider.models import AccessToken
+from rest_framework.serializers import BaseSerializer, ModelSerializer
+from rest_framework.test import APIClient
+
+from RepairOrder.models import JobCard, JobConcern, Vehicle
+from . import catalog, profiling
+from .authentication import TOKEN_CACHE_TIMEOUT, TOKEN_LOCAL_CACHE_TIMEOUT, token_cache_timeout
+from .booking import day_slots, find_slot
+from .catalog import get_catalog
+from .geo import INDEX_VERSION_KEY, station_index
+from .management.commands.explain_hot_queries import INDEX_MARKERS, hot_queries
+from .management.commands.generate_data import USERNAME_PREFIX, generated_counts
+from .models import Appointment, AppointmentSlotBooking, AppointmentSlots, ArchivedRecord, Roles, ServiceStation, ServiceType, User, UserRole
+from .profiling import ProfilingMiddleware
+from .roles import TECHNICIAN_ROLE_ID, Role, get_user_roles, role_members
+from .schema import schema
+from .views import StationServiceView
+
+def make_stations(owner, count, service_types):
+    stations = ServiceStation.objects.bulk_create([  # type: ignore
+        ServiceStation(
+            name=f'Station {i}', owner=owner, address='Main road',
+            latitude=33.6 + i / 1000, longitude=73.0 + i / 1000,
+            phone='0300', email=f'station{i}@example.com',
+        )
+        for i in range(count)
+    ])
+    for station in stations:
+        station.services_offered.set(service_types)
+    return stations
+
+
+def make_appointments(user, station, service_type, count):
+    vehicles = Vehicle.objects.bulk_create([  # type: ignore
+        Vehicle(VIN=f'VIN{i}', PlateNumber=f'ABC-{i}', CreatedBy=user) for i in range(count)
+    ])
+    start = datetime.date(2030, 1, 7)
+    Appointment.objects.bulk_create([  # type: ignore
+        Appointment(
+            user=user, service_station=station, service_type=service_type,
+            appointment_date=start + datetime.timedelta(days=i // 8),
+            appointment_time=datetime.time(9 + i % 8), VehicleID=vehicles[i],
+        )
+        for i in range(count)
+    ])
+
+
+class ListQueryCountTests(TestCase):
+    """
+    Rendering a list page costs the same number of queries whatever its size
+    (see accounts.mixins.optimize_queryset).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', password='secret')
+        self.service_types = [
+            ServiceType.objects.create(name=f'Service {i}', price='10.00') for i in range(3)  # type: ignore
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Loaded once per catalog version, not per page
+        get_catalog()
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_appointment_list(self):
+        station = make_stations(self.user, 1, self.service_types)[0]
+        make_appointments(self.user, station, self.service_types[0], 60)
+        url = reverse('appointment-list')
+        for page_size in (1, 10, 50):
+            with self.subTest(page_size=page_size), self.assertNumQueries(1):
+                response = self.client.get(url, {'page_size': page_size})
+            self.assertEqual(len(response.data['results']), page_size)
+
+    def test_appointment_list_stream(self):
+        station = make_stations(self.user, 1, self.service_types)[0]
+        make_appointments(self.user, station, self.service_types[0], 30)
+        url = reverse('appointment-list')
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'stream': '1'})
+            content = b''.join(response.streaming_content)
+        self.assertEqual(content.count(b'"id"'), 30)
+
+    def test_station_list(self):
+        url = reverse('service-station-list')
+        counts = []
+        for total in (1, 10, 50):
+            make_stations(self.user, total - ServiceStation.objects.count(), self.service_types)  # type: ignore
+            counts.append(self.count_queries(url, {}))
+            counts.append(self.count_queries(url, {'compact': '1'}))
+        self.assertEqual(counts, [2] * len(counts))
+
+
+class AppointmentMutationBookingTests(TestCase):
+    """
+    GraphQL appointment mutations take and move slot places like the REST API.
+    """
+    monday = datetime.date(2030, 1, 7)
+    tuesday = datetime.date(2030, 1, 8)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='customer', password='secret')
+        self.service_type = ServiceType.objects.create(name='Oil change', price='10.00')  # type: ignore
+        self.station = make_stations(self.user, 1, [self.service_type])[0]
+        self.monday_slot = AppointmentSlots.objects.create(  # type: ignore
+            AppointmentDay='Monday', AppointmentTime=datetime.time(9), MaxAppointments=1, CreatedBy=self.user,
+        )
+        self.tuesday_slot = AppointmentSlots.objects.create(  # type: ignore
+            AppointmentDay='Tuesday', AppointmentTime=datetime.time(9), MaxAppointments=1, CreatedBy=self.user,
+        )
+
+    def booked(self, slot, day):
+        booking = AppointmentSlotBooking.objects.filter(AppointmentSlot=slot, AppointmentDate=day).first()  # type: ignore
+        return booking.BookedCount if booking else 0
+
+    def create(self, day):
+        result = schema.execute(
+            """
+            mutation($day: Date!) {
+                createAppointment(appointmentDate: $day, appointmentTime: "09:00:00", status: "pending", notes: "",
+                                  serviceStation: %d, serviceType: %d, user: %d) {
+                    success errors appointment { id }
+                }
+            }
+            """ % (self.station.pk, self.service_type.pk, self.user.pk),
+            variable_values={'day': day.isoformat()},
+        )
+        self.assertIsNone(result.errors)
+        return result.data['createAppointment']
+
+    def update(self, appointment_id, day):
+        result = schema.execute(
+            """
+            mutation($id: Int!, $day: Date!) {
+                updateAppointment(id: $id, appointmentDate: $day) { success errors }
+            }
+            """,
+            variable_values={'id': appointment_id, 'day': day.isoformat()},
+        )
+        self.assertIsNone(result.errors)
+        return result.data['updateAppointment']
+
+    def test_create_reserves_slot(self):
+        created = self.create(self.monday)
+        self.assertTrue(created['success'], created['errors'])
+        self.assertEqual(self.booked(self.monday_slot, self.monday), 1)
+
+        full = self.create(self.monday)
+        self.assertFalse(full['success'])
+        self.assertEqual(Appointment.objects.count(), 1)  # type: ignore
+
+    def test_update_moves_booking(self):
+        appointment_id = int(self.create(self.monday)['appointment']['id'])
+
+        moved = self.update(appointment_id, self.tuesday)
+        self.assertTrue(moved['success'], moved['errors'])
+        self.assertEqual(self.booked(self.monday_slot, self.monday), 0)
+        self.assertEqual(self.booked(self.tuesday_slot, self.tuesday), 1)
+        self.assertEqual(Appointment.objects.get(pk=appointment_id).AppointSlotID, self.tuesday_slot)  # type: ignore
+
+    def test_update_into_full_slot_is_rolled_back(self):
+        self.create(self.tuesday)
+        appointment_id = int(self.create(self.monday)['appointment']['id'])
+
+        moved = self.update(appointment_id, self.tuesday)
+        self.assertFalse(moved['success'])
+        self.assertEqual(Appointment.objects.get(pk=appointment_id).appointment_date, self.monday)  # type: ignore
+        self.assertEqual(self.booked(self.monday_slot, self.monday), 1)
+        self.assertEqual(self.booked(self.tuesday_slot, self.tuesday), 1)
+
+
+class AppointmentRescheduleTests(TestCase):
+    """
+    Rescheduling over REST re-resolves the slot from the new date and time.
+    """
+    monday = datetime.date(2030, 1, 7)
+    friday = datetime.date(2030, 1, 11)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='customer', password='secret')
+        self.service_type = ServiceType.objects.create(name='Oil change', price='10.00')  # type: ignore
+        self.station = make_stations(self.user, 1, [self.service_type])[0]
+        self.monday_slot = AppointmentSlots.objects.create(  # type: ignore
+            AppointmentDay='Monday', AppointmentTime=datetime.time(9), MaxAppointments=5, CreatedBy=self.user,
+        )
+        self.friday_slot = AppointmentSlots.objects.create(  # type: ignore
+            AppointmentDay='Friday', AppointmentTime=datetime.time(9), MaxAppointments=1, CreatedBy=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, day):
+        response = self.client.post(reverse('appointment-list'), {
+            'service_station': self.station.pk, 'service_type': self.service_type.pk,
+            'appointment_date': day.isoformat(), 'appointment_time': '09:00:00',
+            'plate_number': 'ABC-1', 'vin': 'VIN1',
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return Appointment.objects.order_by('-id').first()  # type: ignore
+
+    def patch(self, appointment, data):
+        return self.client.patch(reverse('appointment-detail', args=[appointment.pk]), data, format='json')
+
+    def test_client_slot_is_ignored(self):
+        appointment = self.book(self.monday)
+        response = self.patch(appointment, {'appointment_date': self.friday.isoformat(), 'AppointSlotID': self.monday_slot.pk})
+        self.assertEqual(response.status_code, 200, response.data)
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.AppointSlotID, self.friday_slot)
+
+    def test_reschedule_into_full_slot_is_rejected(self):
+        self.book(self.friday)
+        appointment = self.book(self.monday)
+        response = self.patch(appointment, {'appointment_date': self.friday.isoformat(), 'AppointSlotID': self.monday_slot.pk})
+        self.assertEqual(response.status_code, 400)
+        appointment.refresh_from_db()
+        self.assertEqual((appointment.appointment_date, appointment.AppointSlotID), (self.monday, self.monday_slot))
+
+    def test_no_slot_at_new_time(self):
+        appointment = self.book(self.monday)
+        response = self.patch(appointment, {'appointment_time': '18:00:00'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CatalogVersionTests(TestCase):
+    """
+    Catalog versions are never reused, and expire when the cache is per-process.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_version_is_not_reused_after_cache_loss(self):
+        first = catalog.catalog_version()
+        cache.clear()
+        self.assertNotEqual(catalog.catalog_version(), first)
+
+    def test_bump_changes_version(self):
+        first = catalog.catalog_version()
+        catalog.bump_catalog_version()
+        self.assertNotEqual(catalog.catalog_version(), first)
+
+    def test_local_cache_version_expires(self):
+        first = catalog.catalog_version()
+        later = catalog.time.time() + catalog.CATALOG_LOCAL_MAX_AGE + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertNotEqual(catalog.catalog_version(), first)
+
+    def test_get_catalog_follows_version(self):
+        ServiceType.objects.create(name='Wash', price='5.00')  # type: ignore
+        self.assertEqual([item['name'] for item in get_catalog().values()], ['Wash'])
+        ServiceType.objects.create(name='Polish', price='8.00')  # type: ignore
+        catalog.bump_catalog_version()
+        self.assertEqual([item['name'] for item in get_catalog().values()], ['Wash', 'Polish'])
+
+
+class TokenCacheTimeoutTests(SimpleTestCase):
+    """
+    Cached tokens only outlive a revocation briefly unless every worker shares the cache.
+    """
+
+    def test_process_local_cache_uses_short_timeout(self):
+        self.assertEqual(token_cache_timeout(), TOKEN_LOCAL_CACHE_TIMEOUT)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379/0'}})
+    def test_shared_cache_uses_full_timeout(self):
+        self.assertEqual(token_cache_timeout(), TOKEN_CACHE_TIMEOUT)
+
+
+class TechnicianRoleTests(TestCase):
+    """
+    The technician role is the Roles row with RoleID 1, whatever its name.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.mechanic = User.objects.create_user(username='mechanic', password='secret')
+        self.other = User.objects.create_user(username='other', password='secret')
+        Roles.objects.filter(RoleID=TECHNICIAN_ROLE_ID).update(RoleName='Mechanic')  # type: ignore
+        UserRole.objects.create(User=self.mechanic, Role_id=TECHNICIAN_ROLE_ID)  # type: ignore
+        UserRole.objects.create(User=self.other, Role=Roles.objects.create(RoleName='technician'))  # type: ignore
+
+    def test_user_roles(self):
+        self.assertEqual(get_user_roles(self.mechanic), Role.TECHNICIAN)
+        self.assertEqual(get_user_roles(self.other), Role.NONE)
+
+    def test_role_members(self):
+        self.assertEqual(role_members(Role.TECHNICIAN), frozenset({self.mechanic.pk}))
+
+    def test_name_does_not_add_roles_to_the_technician_row(self):
+        Roles.objects.filter(RoleID=TECHNICIAN_ROLE_ID).update(RoleName='USER')  # type: ignore
+        cache.clear()
+        self.assertEqual(get_user_roles(self.mechanic), Role.TECHNICIAN)
+        self.assertNotIn(self.mechanic.pk, role_members(Role.USER))
+
+
+class RegistrationRoleTests(TestCase):
+    """
+    Self-registration uses the seeded roles and never creates one.
+    """
+
+    def register(self, **fields):
+        return APIClient().post(reverse('register'), {
+            'username': 'new', 'email': 'new@example.com', 'password': 'secret', **fields,
+        })
+
+    def test_seeded_roles(self):
+        self.assertEqual(Roles.objects.get(RoleID=TECHNICIAN_ROLE_ID).RoleName, 'Technician')  # type: ignore
+        response = self.register()
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username='new')
+        self.assertEqual(get_user_roles(user), Role.USER)
+
+    def test_missing_role_is_rejected(self):
+        Roles.objects.filter(RoleName='stations').delete()  # type: ignore
+        count = Roles.objects.count()  # type: ignore
+        response = self.register(role='stations')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('role', response.json())
+        self.assertFalse(User.objects.filter(username='new').exists())
+        self.assertEqual(Roles.objects.count(), count)  # type: ignore
+
+
+class HotQueryIndexTests(TestCase):
+    """
+    Every hot query, as the views build it, can be served by an index.
+
+    The indexes are partial and built concurrently, so this needs the
+    PostgreSQL database the project is configured for; it is not skipped
+    elsewhere, so a run on another backend fails instead of passing silently.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(username='owner', password='secret')
+        service_type = ServiceType.objects.create(name='Oil change', price='10.00')  # type: ignore
+        station = make_stations(user, 1, [service_type])[0]
+        make_appointments(user, station, service_type, 8)
+        AppointmentSlots.objects.create(  # type: ignore
+            AppointmentDay='monday', AppointmentTime=datetime.time(9), MaxAppointments=5, CreatedBy=user,
+        )
+        with connection.cursor() as cursor:
+            # Tables this small would otherwise always be scanned
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_hot_queries_use_indexes(self):
+        for name, queryset in hot_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertTrue(any(marker in plan for marker in INDEX_MARKERS), plan)
+
+    def test_slot_lookups_seek_by_day(self):
+        # The case-insensitive day match must be an index condition, not a filter over every live slot
+        monday = datetime.date(2030, 1, 7)
+        for queryset in (day_slots(monday), day_slots(monday).filter(AppointmentTime=datetime.time(9))):
+            plan = queryset.explain()
+            self.assertIn('slots_live_day_time_idx', plan)
+            self.assertRegex(plan, r'Index Cond: .*upper\(\("AppointmentDay"\)')
+        self.assertIsNotNone(find_slot(monday, datetime.time(9)))
+
+
+class PurgeDeletedTests(TestCase):
+    """
+    purge_deleted never cascades into rows that are not soft-deleted.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='secret')
+        self.service_type = ServiceType.objects.create(name='Oil change', price='10.00')  # type: ignore
+        self.station = make_stations(self.user, 1, [self.service_type])[0]
+
+    def slot(self, **kwargs):
+        return AppointmentSlots.objects.create(  # type: ignore
+            AppointmentDay='Monday', AppointmentTime=datetime.time(9), MaxAppointments=5, CreatedBy=self.user, **kwargs,
+        )
+
+    def appointment(self, slot):
+        return Appointment.objects.create(  # type: ignore
+            user=self.user, service_station=self.station, service_type=self.service_type,
+            appointment_date=datetime.date(2030, 1, 7), appointment_time=datetime.time(9), AppointSlotID=slot,
+        )
+
+    def purge(self):
+        call_command('purge_deleted', days=0, batch_size=1, stdout=StringIO())
+
+    def test_slot_with_live_appointment_is_kept(self):
+        slot = self.slot()
+        live = self.appointment(slot)
+        booking = AppointmentSlotBooking.objects.create(  # type: ignore
+            ServiceStation=self.station, AppointmentSlot=slot, AppointmentDate=live.appointment_date, BookedCount=1,
+        )
+        slot.delete()
+        self.purge()
+        self.assertTrue(AppointmentSlots.all_objects.filter(pk=slot.pk).exists())  # type: ignore
+        self.assertTrue(Appointment.objects.filter(pk=live.pk).exists())  # type: ignore
+        self.assertTrue(AppointmentSlotBooking.objects.filter(pk=booking.pk).exists())  # type: ignore
+
+    def test_fully_deleted_rows_are_purged(self):
+        kept_slot, purged_slot = self.slot(), self.slot()
+        self.appointment(kept_slot)
+        deleted = self.appointment(purged_slot)
+        deleted.delete()
+        for slot in (kept_slot, purged_slot):
+            slot.delete()
+        self.purge()
+        self.assertTrue(AppointmentSlots.all_objects.filter(pk=kept_slot.pk).exists())  # type: ignore
+        self.assertFalse(AppointmentSlots.all_objects.filter(pk=purged_slot.pk).exists())  # type: ignore
+        self.assertFalse(Appointment.all_objects.filter(pk=deleted.pk).exists())  # type: ignore
+        self.assertTrue(ArchivedRecord.objects.filter(ModelLabel='accounts.appointmentslots', ObjectID=str(purged_slot.pk)).exists())  # type: ignore
+
+    def test_job_card_with_live_concern_is_kept(self):
+        now = timezone.now()
+        job_card = JobCard.objects.create(JobCardTypeName='Service', CreatedOn=now, JobCardNumber='JC-1')  # type: ignore
+        concern = JobConcern.objects.create(JobCardID=job_card, CreatedOn=now)  # type: ignore
+        job_card.delete()
+        self.purge()
+        self.assertTrue(JobCard.all_objects.filter(pk=job_card.pk).exists())  # type: ignore
+        self.assertTrue(JobConcern.objects.filter(pk=concern.pk).exists())  # type: ignore
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """
+    Requests are profiled the same way on the sync and async paths, without
+    patching DRF.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='customer', password='secret')
+        AppointmentSlots.objects.create(AppointmentDay='Monday', AppointmentTime=datetime.time(9), MaxAppointments=2, CreatedBy=self.user)  # type: ignore
+
+    def timings(self, response):
+        # Server-Timing: db;dur=...;desc="N queries", serialize;dur=..., render;dur=..., app;dur=..., total;dur=...
+        metrics = dict(entry.split(';', 1)[0:2] for entry in response['Server-Timing'].split(', '))
+        self.assertEqual(set(metrics), {'db', 'serialize', 'render', 'app', 'total'})
+        return metrics
+
+    def queries(self, response):
+        return int(self.timings(response)['db'].split('desc="')[1].split()[0])
+
+    def get_slots(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(reverse('appointment-slots-by-day'), {'appointment_date': '2030-01-07'})
+
+    def test_sync_request(self):
+        response = self.get_slots()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.queries(response), 1)
+
+    def test_serializer_time(self):
+        to_representation = ModelSerializer.to_representation
+
+        def slow(serializer, instance):
+            time.sleep(0.02)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(ModelSerializer, 'to_representation', autospec=True, side_effect=slow):
+            response = self.get_slots()
+        self.assertGreaterEqual(float(self.timings(response)['serialize'].removeprefix('dur=')), 20)
+
+    def test_budgets_are_per_method(self):
+        budgets = {'POST appointment-slots-by-day': {'queries': 0}}
+        with mock.patch.dict(profiling.CONFIG, BUDGETS=budgets), self.assertNoLogs('accounts.profiling', 'WARNING'):
+            self.get_slots()
+        budgets = {'GET appointment-slots-by-day': {'queries': 0}}
+        with mock.patch.dict(profiling.CONFIG, BUDGETS=budgets), self.assertLogs('accounts.profiling', 'WARNING'):
+            self.get_slots()
+
+    async def test_async_request(self):
+        await AccessToken.objects.acreate(  # type: ignore
+            user=self.user, token='profiling', scope='read write', expires=timezone.now() + datetime.timedelta(hours=1),
+        )
+        response = await AsyncClient().get(
+            reverse('appointment-slots-by-day-async'), {'appointment_date': '2030-01-07'},
+            headers={'Authorization': 'Bearer profiling'},
+        )
+        self.assertEqual(response.status_code, 200)
+        # The token and slot lookups run off the event loop thread and still count
+        self.assertGreaterEqual(self.queries(response), 2)
+
+    def test_async_capable(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(ProfilingMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(ProfilingMiddleware(lambda request: HttpResponse())))
+
+    def test_serializers_are_not_patched(self):
+        self.assertEqual(BaseSerializer.__dict__['data'].fget.__module__, 'rest_framework.serializers')
+
+
+class GenerateDataClearTests(TestCase):
+    """
+    generate_data gives generated users the seeded roles, and --clear deletes
+    generated rows only, never the shared slots or the real appointments
+    booked on them.
+    """
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='secret')
+        self.station = ServiceStation.objects.create(  # type: ignore
+            name='Station', owner=self.customer, address='Main road', phone='0300', email='station@example.com',
+        )
+        self.service_type = ServiceType.objects.create(name='Oil change', price=10)  # type: ignore
+        call_command('generate_data', scale=0.01, stdout=StringIO())
+
+    def book(self, station):
+        day, at = datetime.date(2030, 1, 7), datetime.time(9)
+        return Appointment.objects.create(  # type: ignore
+            user=self.customer, service_station=station, service_type=self.service_type,
+            appointment_date=day, appointment_time=at, notes='', AppointSlotID=find_slot(day, at),
+        )
+
+    def test_real_appointment_on_generated_slot_survives(self):
+        self.assertFalse(find_slot(datetime.date(2030, 1, 7), datetime.time(9)).CreatedBy.username.startswith(USERNAME_PREFIX))
+        appointment = self.book(self.station)
+        call_command('generate_data', clear_only=True, stdout=StringIO())
+        self.assertEqual(set(generated_counts().values()), {0})
+        self.assertTrue(Appointment.objects.filter(pk=appointment.pk).exists())  # type: ignore
+        self.assertEqual(AppointmentSlots.objects.count(), 56)  # type: ignore
+
+    def test_generated_roles(self):
+        # A database whose Roles table starts empty: no name-created row may take the technician RoleID
+        call_command('generate_data', clear_only=True, stdout=StringIO())
+        UserRole.objects.all().delete()  # type: ignore
+        Roles.objects.all().delete()  # type: ignore
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Roles]):
+                cursor.execute(sql)
+        cache.clear()
+        call_command('generate_data', scale=0.01, stdout=StringIO())
+
+        technicians = role_members(Role.TECHNICIAN)
+        generated = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        self.assertTrue(technicians)
+        self.assertEqual(technicians, frozenset(generated.filter(username__contains='_tech').values_list('pk', flat=True)))
+        customer = generated.filter(username__contains='_customer').first()
+        self.assertEqual(get_user_roles(customer), Role.USER)
+
+    def test_refuses_to_cascade_into_real_rows(self):
+        bench_station = ServiceStation.objects.filter(owner__username__startswith=USERNAME_PREFIX).first()  # type: ignore
+        appointment = self.book(bench_station)
+        before = generated_counts()
+        with self.assertRaisesMessage(CommandError, '1 accounts.Appointment'):
+            call_command('generate_data', clear_only=True, stdout=StringIO())
+        self.assertEqual(generated_counts(), before)
+        self.assertTrue(Appointment.objects.filter(pk=appointment.pk).exists())  # type: ignore
+
+
+class ConditionalGetTests(TestCase):
+    """
+    ConditionalGetMixin: 304s, negotiated rendering, and rendered bodies
+    cached only in a shared cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='customer', password='secret')
+        self.station = make_stations(self.user, 1, [ServiceType.objects.create(name='Oil change', price=10)])[0]  # type: ignore
+        self.url = reverse('station-services', args=[self.station.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_twice(self):
+        with mock.patch.object(StationServiceView, 'get_data', autospec=True, side_effect=StationServiceView.get_data) as get_data:
+            first, second = self.client.get(self.url), self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['Content-Type'], second['Content-Type'])
+        return get_data.call_count
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        catalog.bump_catalog_version()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_content_negotiation(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertIn('Accept', response['Vary'])
+        self.assertEqual(self.client.get(self.url).json()[0]['name'], 'Oil change')
+
+    def test_process_local_cache_renders_every_time(self):
+        self.assertEqual(self.get_twice(), 2)
+
+    def test_shared_cache_keeps_bodies(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            self.assertEqual(self.get_twice(), 1)
+
+
+class NearbyStationsQueryTests(TestCase):
+    """
+    Bad coordinates and radii are rejected with a 400, never reach the grid
+    index.
+    """
+    url_name = 'nearby-service-stations'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='customer', password='secret')
+        make_stations(self.user, 3, [])
+
+    def get(self, **params):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(reverse(self.url_name), params)
+
+    def test_invalid_values(self):
+        for params in (
+            {}, {'lat': '33.6'}, {'lat': 'x', 'lng': '73'},
+            {'lat': 'nan', 'lng': '73'}, {'lat': 'inf', 'lng': '73'}, {'lat': '33.6', 'lng': '-inf'},
+            {'lat': '91', 'lng': '73'}, {'lat': '33.6', 'lng': '181'}, {'lat': '1e400', 'lng': '73'},
+            {'lat': '33.6', 'lng': '73', 'radius': 'inf'}, {'lat': '33.6', 'lng': '73', 'radius': 'nan'},
+            {'lat': '33.6', 'lng': '73', 'radius': '-1'},
+        ):
+            with self.subTest(**params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_valid_values(self):
+        self.assertEqual(len(self.get(lat='33.6', lng='73.0', radius='5').json()), 3)
+        # Radii past half the globe are clamped, not rejected
+        self.assertEqual(len(self.get(lat='-33.6', lng='-107.0', radius='1e9').json()), 3)
+        self.assertEqual(self.get(lat='90', lng='-180', radius='0').json(), [])
+
+
+class StationIndexVersionTests(TestCase):
+    """
+    The station index version never repeats, even after the cache loses it.
+    """
+
+    def test_version_never_repeats(self):
+        cache.clear()
+        seen = set()
+        for _ in range(3):
+            station_index.invalidate()
+            seen.add(cache.get(INDEX_VERSION_KEY))
+        cache.clear()
+        station_index.invalidate()
+        self.assertNotIn(cache.get(INDEX_VERSION_KEY), seen)
+
+    def test_lost_version_rebuilds(self):
+        user = User.objects.create_user(username='owner', password='secret')
+        station_index.nearby(33.6, 73.0, 5)
+        cache.clear()  # e.g. a restart: changes made meanwhile must not be missed
+        ServiceStation.objects.bulk_create([ServiceStation(  # type: ignore
+            name='New', owner=user, address='Main road', latitude=33.6, longitude=73.0, phone='0300', email='new@example.com',
+        )])
+        self.assertEqual(len(station_index.nearby(33.6, 73.0, 5)), 1)
+
+
+class AsyncNearbyStationsQueryTests(NearbyStationsQueryTests):
+    url_name = 'nearby-service-stations-async'
+
+
+class KeysetCursorTests(TestCase):
+    """
+    A cursor a client has tampered with is a 404, never a 500.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='customer', password='secret')
+        service_type = ServiceType.objects.create(name='Oil change', price=10)  # type: ignore
+        station = make_stations(self.user, 1, [service_type])[0]
+        make_appointments(self.user, station, service_type, 3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, cursor):
+        return self.client.get(reverse('appointment-list'), {'cursor': cursor, 'page_size': 1})
+
+    def test_invalid_cursors(self):
+        def encode(values):
+            return b64encode(json.dumps(values).encode()).decode()
+
+        for cursor in (
+            'not base64!', encode({'a': 1}), encode(['2030-01-07', '09:00:00']),
+            encode(['notadate', '09:00:00', 1]), encode(['2030-01-07', '25:00', 1]),
+            encode(['2030-01-07', '09:00:00', 'x']), encode([None, None, None]),
+            encode([['2030-01-07'], '09:00:00', 1]),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.get(cursor).status_code, 404)
+
+    def test_next_link(self):
+        seen = []
+        url = f"{reverse('appointment-list')}?page_size=1"
+        while url:
+            page = self.client.get(url).json()
+            seen += [appointment['id'] for appointment in page['results']]
+            url = page['next']
+        self.assertEqual(len(set(seen)), 3)
@@ -4,6 +4,7 @@ from .views import (
     HelloView, 
     UserRegistrationView, 
     AdminOnlyView,
+    MetricsView,
     ServiceTypeListCreateView,
     ServiceTypeDetailView,
     ServiceStationListCreateView,
@@ -13,12 +14,19 @@ from .views import (
     AppointmentDetailView,
     StationServiceView,
     AppointmentSlotsByDayView,
+    AppointmentAvailabilityView,
+)
+from .async_views import (
+    AsyncNearbyServiceStationsView,
+    AsyncAppointmentSlotsByDayView,
+    AsyncStationServiceView,
 )
 
 urlpatterns = [
     path('hello/', HelloView.as_view(), name='hello'),
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('admin-only/', AdminOnlyView.as_view(), name='admin-only'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     # Service Types
     path('service-types/', ServiceTypeListCreateView.as_view(), name='service-type-list'),
     path('service-types/<int:pk>/', ServiceTypeDetailView.as_view(), name='service-type-detail'),
@@ -34,6 +42,13 @@ urlpatterns = [
 
     # Get Appointment Slots for a specific day 
     path('appointment-slots/',AppointmentSlotsByDayView.as_view(),name='appointment-slots-by-day'),
+    # Remaining capacity per slot for a station and date range
+    path('appointment-slots/availability/',AppointmentAvailabilityView.as_view(),name='appointment-availability'),
     # Get the service types offered by a specific station 
     path('station-services/<int:station_id>/',StationServiceView.as_view(),name='station-services'),
+
+    # Async variants of the read-heavy endpoints above (serve under ASGI)
+    path('async/service-stations/nearby/', AsyncNearbyServiceStationsView.as_view(), name='nearby-service-stations-async'),
+    path('async/appointment-slots/', AsyncAppointmentSlotsByDayView.as_view(), name='appointment-slots-by-day-async'),
+    path('async/station-services/<int:station_id>/', AsyncStationServiceView.as_view(), name='station-services-async'),
 ]
@@ -6,24 +6,52 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import generics, status
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+from django.http import Http404, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.utils.encoders import JSONEncoder
 from .serializers import (
     UserRegistrationSerializer, 
     ServiceTypeSerializer,
     ServiceStationSerializer,
+    ServiceStationCompactSerializer,
     ServiceStationCreateSerializer,
     AppointmentSerializer,
     AppointmentCreateSerializer,
     StationServiceSerializer,
-    AppointmentSlotsSerializer
+    AppointmentSlotsSerializer,
+    AppointmentAvailabilitySerializer,
 )
 from .models import AppointmentSlots, ServiceStation # type: ignore
 from .models import User, ServiceType,Appointment, StationService
 from .permissions import IsAdmin, IsServiceStation
-from math import radians, sin, cos, sqrt, atan2
+from .roles import Role, get_user_roles
+from .geo import parse_nearby_query, station_index
+from .pagination import AppointmentKeysetPagination
+from .mixins import OptimizedQuerySetMixin, optimize_queryset
+from .catalog import catalog_etag, catalog_modified, catalog_version, get_catalog
+from .http_cache import ConditionalGetMixin, row_version
+from .booking import SlotFullError, availability, booking_key, day_slots, release_slot, sync_booking
+from .profiling import metrics
 
 # Create your views here.
 
+def station_version(queryset, pk):
+    """
+    Version and last-modified time of a station's representation: its
+    ``updated_at`` (touched when its services change too) plus the catalog
+    version its services are rendered from.
+    """
+    updated_at = queryset.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        raise Http404
+    version = f'{row_version(pk, updated_at)}-c{catalog_version()}'
+    return version, max(updated_at.timestamp(), catalog_modified())
+
 class AppointmentSlotsByDayView(ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = AppointmentSlotsSerializer
@@ -38,12 +66,33 @@ class AppointmentSlotsByDayView(ListAPIView):
         if not appointment_date:
             raise ValidationError({"date": "Invalid date format."})
 
-        day_name = appointment_date.strftime('%A')
+        return day_slots(appointment_date)
+class AppointmentAvailabilityView(APIView):
+    """
+    Remaining capacity per slot at a station for a date range
+    (``station``, ``date_from``, ``date_to``; at most 31 days).
+    """
+    permission_classes = [IsAuthenticated]
+    max_days = 31
+
+    def get(self, request):
+        params = request.query_params
+        station_id = params.get("station")
+        if not station_id or not station_id.isdigit():
+            raise ValidationError({"station": "Station query parameter is required."})
+
+        date_from = parse_date(params["date_from"]) if params.get("date_from") else timezone.localdate()
+        if not date_from:
+            raise ValidationError({"date_from": "Invalid date format."})
+        date_to = parse_date(params["date_to"]) if params.get("date_to") else date_from + timedelta(days=6)
+        if not date_to:
+            raise ValidationError({"date_to": "Invalid date format."})
+        if date_to < date_from or (date_to - date_from).days >= self.max_days:
+            raise ValidationError({"date_to": f"Range must be between 1 and {self.max_days} days."})
+
+        days = availability(int(station_id), date_from, date_to)
+        return Response(AppointmentAvailabilitySerializer(days, many=True).data)
 
-        return AppointmentSlots.objects.filter(
-            AppointmentDay__iexact=day_name,
-            IsDeleted=False,
-        ).order_by("AppointmentTime")
 class HelloView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -61,22 +110,72 @@ class AdminOnlyView(APIView):
     def get(self, request):
         return Response({"message": "Hello, Admin!"})
 
+class MetricsView(APIView):
+    """
+    Per-endpoint latency, query, serializer and render timings of this process's
+    recent requests (see accounts.profiling).
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
 # Service Type Views
 class ServiceTypeListCreateView(generics.ListCreateAPIView):
     queryset = ServiceType.objects.all()  # type: ignore
     serializer_class = ServiceTypeSerializer
     permission_classes = [IsAuthenticated]
 
-class ServiceTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
+    @method_decorator(condition(etag_func=catalog_etag))
+    def get(self, request, *args, **kwargs):
+        return Response(list(get_catalog().values()))
+
+class ServiceTypeDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    GET is served from the cached catalog and versioned by it.
+    """
     queryset = ServiceType.objects.all()  # type: ignore
     serializer_class = ServiceTypeSerializer
     permission_classes = [IsAuthenticated]
+    cache_resource = 'service-type'
+
+    def get_resource_version(self, request, pk):
+        if pk not in get_catalog():
+            raise Http404
+        return f'{pk}-v{catalog_version()}', catalog_modified()
+
+    def get_data(self, request, pk):
+        return get_catalog()[pk]
 
 # Service Station Views
-class ServiceStationListCreateView(generics.ListCreateAPIView):
+class ServiceStationListCreateView(OptimizedQuerySetMixin, generics.ListCreateAPIView):
+    """
+    ``?compact=1`` returns ``{"results": [...], "service_types": {id: {...}}}``
+    with each station's services as IDs into the shared ``service_types`` map.
+    """
     serializer_class = ServiceStationSerializer
     permission_classes = [IsAuthenticated]
 
+    def is_compact(self):
+        return self.request.method == 'GET' and self.request.query_params.get('compact') in ('1', 'true')
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return ServiceStationCompactSerializer
+        return ServiceStationSerializer
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.is_compact():
+            catalog = get_catalog()
+            stations = response.data['results'] if isinstance(response.data, dict) else response.data
+            service_ids = {pk for station in stations for pk in station['services_offered']}
+            response.data = {
+                'results': stations,
+                'service_types': {pk: catalog[pk] for pk in sorted(service_ids) if pk in catalog},
+            }
+        return response
+
     def get_queryset(self):
         #if self.request.user.role == 'admin':
         #    return ServiceStation.objects.all()  # type: ignore
@@ -87,22 +186,36 @@ class ServiceStationListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
-class StationServiceView(APIView):
+class StationServiceView(ConditionalGetMixin, APIView):
+    cache_resource = 'station-services'
 
-    def get(self, request,station_id):
-        st = ServiceStation.objects.get(id=station_id)
-        services=st.services_offered.all()
-        serializer = StationServiceSerializer(services, many=True)
-        return Response(serializer.data)
+    def get_resource_version(self, request, station_id):
+        return station_version(ServiceStation.objects.all(), station_id)  # type: ignore
+
+    def get_data(self, request,station_id):
+        # Existence was checked by get_resource_version. Only the IDs come from
+        # the database; the payloads come from the cached catalog
+        service_ids = ServiceType.objects.filter(stations=station_id).order_by('id').values_list('id', flat=True)  # type: ignore
+        catalog = get_catalog()
+        return [catalog[pk] for pk in service_ids if pk in catalog]
         
-class ServiceStationDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ServiceStationDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ServiceStationSerializer
     permission_classes = [IsAuthenticated]
+    cache_resource = 'service-station'
+
+    def get_resource_version(self, request, pk):
+        # Checked against get_queryset() so a 304 never reveals a hidden station
+        return station_version(self.get_queryset(), pk)
+
+    def get_data(self, request, pk):
+        return self.get_serializer(self.get_object()).data
 
     def get_queryset(self):
-        if self.request.user.role == 'admin':
+        roles = get_user_roles(self.request.user)
+        if roles & Role.ADMIN:
             return ServiceStation.objects.all()  # type: ignore
-        elif self.request.user.role == 'stations':
+        elif roles & Role.SERVICE_STATION:
             return ServiceStation.objects.filter(owner=self.request.user)  # type: ignore
         else:
             return ServiceStation.objects.filter(is_active=True)  # type: ignore
@@ -112,61 +225,77 @@ class NearbyServiceStationsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        lat = request.query_params.get('lat')
-        lng = request.query_params.get('lng')
-        radius = float(request.query_params.get('radius', 10))  # Default 10km
-
-        if not lat or not lng:
+        try:
+            lat, lng, radius = parse_nearby_query(request.query_params)
+        except ValueError as error:
             return Response(
-                {"error": "Latitude and longitude are required"},
+                {"error": str(error)},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            lat = float(lat)
-            lng = float(lng)
-            stations = ServiceStation.objects.filter( #type: ignore
-                is_active=True,
-                latitude__isnull=False,
-                longitude__isnull=False
-            )
-
-            # Calculate distances and filter
-            nearby = []
-            for station in stations:
-                dist = station.distance_to(lat, lng)
-                if dist <= radius:
-                    nearby.append((dist, station))
-
-            # Sort by distance
-            nearby.sort(key=lambda x: x[0])
-            result_stations = [station for dist, station in nearby]
-
-            serializer = ServiceStationSerializer(result_stations, many=True)
-            return Response(serializer.data)
+        # Grid-pruned radius search, already sorted by distance
+        nearby = station_index.nearby(lat, lng, radius)
+        stations = optimize_queryset(
+            ServiceStation.objects.filter(is_active=True),  # type: ignore
+            ServiceStationSerializer,
+        ).in_bulk([pk for pk, dist in nearby])
+        result_stations = [stations[pk] for pk, dist in nearby if pk in stations]
 
-        except ValueError:
-            return Response(
-                {"error": "Invalid coordinates"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = ServiceStationSerializer(result_stations, many=True)
+        return Response(serializer.data)
 
 # Appointment Views
-class AppointmentListCreateView(generics.ListCreateAPIView):
+class AppointmentListCreateView(OptimizedQuerySetMixin, generics.ListCreateAPIView):
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return AppointmentCreateSerializer
         return AppointmentSerializer
     
     permission_classes = [IsAuthenticated]
+    pagination_class = AppointmentKeysetPagination
+    stream_chunk_size = 500
 
     def get_queryset(self):
             return Appointment.objects.filter(IsDeleted = 0 )  # type: ignore
             #return Appointment.objects.filter(service_station__owner=self.request.user , IsDeleted = 0 )  # type: ignore
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream') in ('1', 'true'):
+            return self.stream_list(request)
+        return super().list(request, *args, **kwargs)
+
+    def stream_list(self, request):
+        """
+        Stream every appointment as one JSON array. Rows are read through a
+        server-side cursor and serialized chunk by chunk, so memory use stays
+        flat regardless of table size.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by(*self.pagination_class.ordering)
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        encoder = JSONEncoder()
+
+        def rows():
+            yield '['
+            chunk, first = [], True
+            for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+                chunk.append(obj)
+                if len(chunk) == self.stream_chunk_size:
+                    yield from serialize(chunk, first)
+                    chunk, first = [], False
+            if chunk:
+                yield from serialize(chunk, first)
+            yield ']'
+
+        def serialize(chunk, first):
+            for i, item in enumerate(serializer_class(chunk, many=True, context=context).data):
+                yield ('' if first and i == 0 else ',') + encoder.encode(item)
+
+        return StreamingHttpResponse(rows(), content_type='application/json')
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AppointmentDetailView(OptimizedQuerySetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
 
@@ -177,9 +306,21 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         #    return Appointment.objects.filter(service_station__owner=self.request.user , IsDeleted = 0)  # type: ignore
         #else:
         return Appointment.objects.filter(user=self.request.user , IsDeleted = 0)  # type: ignore
-        
-        def destroy(self, request, *args, **kwargs):
-            instance = self.get_object()
-            instance.IsDeleted = True
-            instance.save()
-            return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+
+    def perform_update(self, serializer):
+        # Cancelling or rescheduling gives the old slot place back
+        with transaction.atomic():
+            before = booking_key(serializer.instance)
+            appointment = serializer.save()
+            try:
+                sync_booking(before, appointment)
+            except SlotFullError:
+                raise ValidationError("This appointment slot is fully booked. Please select another slot.")
+
+    def perform_destroy(self, instance):
+        # Soft delete (IsDeleted); the appointment's slot place is given back
+        with transaction.atomic():
+            before = booking_key(instance)
+            instance.delete()
+            if before is not None:
+                release_slot(*before)
\ No newline at end of file
@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack
+    'accounts.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -58,6 +60,27 @@ MIDDLEWARE = [
 GRAPHENE = {
     "SCHEMA": "accounts.schema.schema"
 }
+# Static limits enforced by accounts.query_cost.QueryCostRule before execution
+GRAPHQL_QUERY_LIMITS = {
+    'MAX_DEPTH': 8,
+    'MAX_COST': 5000,
+}
+# Request profiling (accounts.profiling): Server-Timing headers, /api/accounts/metrics/
+# and a warning on the accounts.profiling logger when a request goes over budget
+PROFILING = {
+    'ENABLED': True,
+    'WINDOW': 1000,
+    'QUERY_BUDGET': 25,
+    'TIME_BUDGET_MS': 1000,
+    # Keyed by method and URL name; other requests get the default budgets above
+    'BUDGETS': {
+        'GET appointment-list': {'queries': 5, 'time_ms': 300},
+        'GET nearby-service-stations': {'queries': 5, 'time_ms': 300},
+        'GET all-job-cards': {'queries': 5, 'time_ms': 300},
+    },
+}
+# Job card numbers each worker reserves per station at a time (RepairOrder.sequences)
+JOBCARD_NUMBER_BLOCK_SIZE = 20
 ROOT_URLCONF = 'car_services_backend.urls'
 
 TEMPLATES = [
@@ -136,11 +159,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'oauth2_provider.contrib.rest_framework.OAuth2Authentication',
+        'accounts.authentication.CachedOAuth2Authentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSONRenderer that reports its time to accounts.profiling
+    'DEFAULT_RENDERER_CLASSES': (
+        'accounts.profiling.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema'
 }
 
@@ -179,4 +207,38 @@ SPECTACULAR_SETTINGS = {
 APPEND_SLASH=False
 CSRF_COOKIE_SECURE=True
 import os
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
\ No newline at end of file
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Shared cache for the service type catalog and other versioned lookups.
+# Multiple worker processes need a cache they all reach (e.g. Redis/Memcached):
+# gunicorn.conf.py defaults to Redis at REDIS_URL. LocMemCache (the default for
+# runserver and tests) is per process; see accounts.caching.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
+# Database connections. By default each worker thread keeps its connection for
+# DJANGO_DB_CONN_MAX_AGE seconds (checked before reuse) instead of reconnecting
+# on every request. DJANGO_DB_POOL=1 uses a psycopg 3 connection pool per
+# worker process instead; pooling and persistent connections are exclusive.
+DATABASES['default'].update({
+    'NAME': os.environ.get('POSTGRES_DB', DATABASES['default']['NAME']),
+    'USER': os.environ.get('POSTGRES_USER', DATABASES['default']['USER']),
+    'PASSWORD': os.environ.get('POSTGRES_PASSWORD', DATABASES['default']['PASSWORD']),
+    'HOST': os.environ.get('POSTGRES_HOST', DATABASES['default']['HOST']),
+    'PORT': os.environ.get('POSTGRES_PORT', DATABASES['default']['PORT']),
+    'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 60)),
+    'CONN_HEALTH_CHECKS': True,
+})
+if os.environ.get('DJANGO_DB_POOL') == '1':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DJANGO_DB_POOL_TIMEOUT', 10)),
+        },
+    }
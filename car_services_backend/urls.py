@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
+from accounts.graphql_views import AuthenticatedGraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,5 +26,6 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')),
     path('api/jobs/', include('RepairOrder.urls')),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui')
+    path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('graphql/', csrf_exempt(AuthenticatedGraphQLView.as_view()), name='graphql'),
 ]
@@ -0,0 +1,41 @@
+"""
+Production server settings, read from the environment.
+
+    gunicorn -c gunicorn.conf.py
+
+DJANGO_SERVER_MODE=wsgi (default) runs threaded sync workers on the WSGI app;
+DJANGO_SERVER_MODE=asgi runs uvicorn workers on the ASGI app (needed for the
+async views).
+"""
+import multiprocessing
+import os
+
+mode = os.environ.get('DJANGO_SERVER_MODE', 'wsgi')
+
+# Workers are separate processes, so the version-stamped caches (service type
+# catalog, tokens, roles, assign-data, workload, station index) need a cache
+# they all share. Redis is the default here; see the redis service in
+# docker-compose.yml. Set DJANGO_CACHE_BACKEND to use something else.
+if 'DJANGO_CACHE_BACKEND' not in os.environ:
+    os.environ['DJANGO_CACHE_BACKEND'] = 'django.core.cache.backends.redis.RedisCache'
+    os.environ.setdefault('DJANGO_CACHE_LOCATION', os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+if mode == 'asgi':
+    wsgi_app = 'car_services_backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'car_services_backend.wsgi:application'
+    worker_class = 'gthread'
+    # Each thread holds its own persistent database connection (CONN_MAX_AGE)
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))